@@ -2,7 +2,9 @@
 Module entry point so GuardDog can be run as `python -m guarddog`
 or bundled into an EXE later.
 """
+import sys
+
 from .main import main
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(main(sys.argv[1:]))
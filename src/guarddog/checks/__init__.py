@@ -2,3 +2,96 @@
 Check implementations for GuardDog.
 Each module exposes one or more functions that perform a specific check and return a structured result.
 """
+
+from __future__ import annotations
+
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence
+
+from ._com import com_scope
+from ._psbatch import PowerShellBatch
+from ._registry import clear_values_cache
+
+
+# Report order. Check modules are named here and imported by run_all, so importing the
+# package (or one of its helpers such as _registry) does not load every check.
+ALL_CHECKS = ("firewall", "rdp", "defender", "local_admins", "screen_lock")
+
+
+def _resolve_check(check: Any) -> Any:
+    """Import a check module given by name (see ALL_CHECKS); module objects pass through."""
+    if isinstance(check, str):
+        return importlib.import_module(f".{check}", __name__)
+    return check
+
+
+def _run_check(check) -> Dict[str, Any]:
+    """
+    Run one check module, turning an unexpected exception into an UNKNOWN result
+    so one failure does not kill the entire run.
+
+    COM is initialized once around the whole check (see _com.py), so the
+    COM-backed queries inside it do not each pay for CoInitialize/CoUninitialize.
+
+    The status is normalized to upper case here, once, so the report layer can
+    rely on the canonical form.
+    """
+    try:
+        with com_scope():
+            result = check.run()
+        result["status"] = str(result.get("status", "UNKNOWN")).upper()
+        return result
+    except Exception as exc:  # noqa: BLE001
+        # In an MVP, we keep error handling simple: mark the check as failed to run.
+        return {
+            "id": getattr(check, "__name__", "unknown_check"),
+            "title": getattr(check, "__doc__", "Unknown check").strip().splitlines()[0]
+            if getattr(check, "__doc__", None)
+            else "Unknown check",
+            "status": "UNKNOWN",
+            "summary": "This check failed to run due to an internal error.",
+            "details": f"Error: {exc!r}",
+            "remediation": "You can ignore this for now or try a newer version of GuardDog later.",
+        }
+
+
+def clear_caches() -> None:
+    """
+    Forget everything memoized about the system, so the next run queries it afresh:
+    registry handles and values, the PowerShell batch, the per-check ttl caches and
+    the local account RID lookups.
+    """
+    from . import firewall, local_admins, rdp
+
+    clear_values_cache()
+    PowerShellBatch.reset()
+    firewall._run_netsh_allprofiles.cache_clear()
+    rdp._get_rdp_state.cache_clear()
+    local_admins._get_local_admins_state.cache_clear()
+    local_admins._account_rids.clear()
+
+
+def run_all(checks: Sequence[Any] = ALL_CHECKS) -> List[Dict[str, Any]]:
+    """
+    Run check modules (module objects or ALL_CHECKS names) concurrently and return their
+    results in the given order.
+
+    Each check module exposes a `run()` function returning a dict with:
+        id, title, status, summary, details, remediation
+
+    Checks are independent and mostly wait on the OS (registry, COM, PowerShell),
+    which releases the GIL, so a thread pool brings wall time down to roughly
+    the slowest check.
+
+    The shared PowerShell batch is reset first, so each run gets fresh PowerShell data.
+    """
+    if not checks:
+        return []
+    PowerShellBatch.reset()
+    # Import every check before any of them runs: checks register their PowerShell fragments
+    # at import time, and the shared batch must contain all of them (see _psbatch.py).
+    checks = [_resolve_check(check) for check in checks]
+    # executor.map already yields results in submission order, so no re-sorting is needed.
+    with ThreadPoolExecutor(max_workers=len(checks), thread_name_prefix="guarddog-check") as executor:
+        return list(executor.map(_run_check, checks))
@@ -0,0 +1,59 @@
+"""Small time-bounded memoization for OS queries.
+
+A GuardDog run may call a check more than once (e.g. a caller re-rendering the
+report); the registry reads and process starts behind a check do not need to be
+repeated within a few seconds. `ttl_cache` keeps the last result of a function
+for a fixed time:
+
+    @ttl_cache(30)
+    def _get_rdp_state() -> RdpState: ...
+
+Only the most recent call is remembered (one slot, keyed by its arguments).
+Exceptions are not cached. `fn.cache_clear()` drops the stored result.
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+
+DEFAULT_TTL_SECONDS = 30
+
+_MISSING = object()
+
+
+def ttl_cache(seconds: float = DEFAULT_TTL_SECONDS) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Return a decorator that memoizes the last call of a function for `seconds`."""
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        lock = threading.Lock()
+        # (call key, result, expiry time from time.monotonic())
+        slot: list[Optional[Tuple[Any, Any, float]]] = [None]
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = (args, tuple(sorted(kwargs.items())))
+            with lock:
+                cached = slot[0]
+                result = _MISSING
+                if cached is not None and cached[0] == key and time.monotonic() < cached[2]:
+                    result = cached[1]
+            if result is not _MISSING:
+                return result
+
+            result = fn(*args, **kwargs)
+            with lock:
+                slot[0] = (key, result, time.monotonic() + seconds)
+            return result
+
+        def cache_clear() -> None:
+            with lock:
+                slot[0] = None
+
+        wrapper.cache_clear = cache_clear  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
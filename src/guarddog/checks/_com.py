@@ -0,0 +1,79 @@
+"""Shared COM initialization for checks that use pywin32 (WMI, HNetCfg.FwPolicy2).
+
+Initializing and tearing down COM around every single query is expensive when
+several COM-backed queries run in one check, so COM is initialized once per
+worker thread for the duration of a check:
+
+    with com_scope() as com_ready:
+        if not com_ready:
+            return None
+        ...
+
+`run_all` (see checks/__init__.py) wraps every check in `com_scope()`; nested
+scopes on the same thread only bump a per-thread depth counter, so a query
+helper can also be called on its own (it then initializes COM itself).
+
+pythoncom is imported lazily; without pywin32 the scope yields False.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import threading
+from typing import Iterator
+
+
+_local = threading.local()
+
+# CoInitializeEx result when the thread already runs COM in another apartment (e.g. an
+# STA GUI or test-runner thread). COM is usable then, but the initialization is not ours.
+RPC_E_CHANGED_MODE = -2147417850  # 0x80010106
+
+
+@functools.cache
+def _pythoncom():
+    """Import pythoncom on first use; None when pywin32 is not installed."""
+    try:
+        import pythoncom  # type: ignore[import-not-found]
+    except ImportError:
+        return None
+    return pythoncom
+
+
+@contextlib.contextmanager
+def com_scope() -> Iterator[bool]:
+    """
+    Keep COM (multithreaded apartment) initialized on this thread for the block.
+
+    Yields True when COM is usable. Only the outermost scope on a thread calls
+    CoInitializeEx, and CoUninitialize only when that call succeeded; a thread
+    already initialized as STA (RPC_E_CHANGED_MODE) is usable as is.
+    """
+    depth = getattr(_local, "depth", 0)
+    if depth:
+        _local.depth = depth + 1
+        try:
+            yield _local.ready
+        finally:
+            _local.depth -= 1
+        return
+
+    pythoncom = _pythoncom()
+    ready = False
+    initialized = False
+    if pythoncom is not None:
+        try:
+            pythoncom.CoInitializeEx(pythoncom.COINIT_MULTITHREADED)
+            ready = initialized = True
+        except pythoncom.com_error as exc:
+            ready = bool(exc.args) and exc.args[0] == RPC_E_CHANGED_MODE
+
+    _local.depth = 1
+    _local.ready = ready
+    try:
+        yield ready
+    finally:
+        _local.depth = 0
+        if initialized:
+            pythoncom.CoUninitialize()
@@ -0,0 +1,230 @@
+"""Long-lived PowerShell host shared by all checks in one run.
+
+Starting powershell.exe costs far more than running a small script in it, so
+instead of one process per query we keep a single child alive:
+
+    powershell.exe -NoLogo -NoProfile -NonInteractive -Command -
+
+and feed it one script per line on stdin. Each script is sent base64-encoded
+(so multi-line scripts survive the line-based protocol) and is followed by an
+end marker carrying a success flag:
+
+    <<END:<token>:True>>
+
+`eval()` reads stdout until it sees its marker and returns everything before it.
+If the host cannot be started or dies, `PSHostUnavailable` is raised so callers
+can fall back to a one-shot PowerShell process.
+
+- Non-admin.
+- Read-only.
+- No network access.
+"""
+
+from __future__ import annotations
+
+import atexit
+import base64
+import functools
+import itertools
+import os
+import queue
+import shutil
+import threading
+import time
+from typing import List, Optional
+
+
+class PSHostUnavailable(RuntimeError):
+    """The resident PowerShell host could not be started or is no longer usable."""
+
+
+# subprocess.CREATE_NO_WINDOW, spelled out so it is known without importing subprocess.
+_CREATE_NO_WINDOW = 0x08000000 if os.name == "nt" else 0
+
+_END_PREFIX = b"<<END:"
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+
+@functools.cache
+def _subprocess():
+    """Import subprocess on first PowerShell use; a registry-only run never pays for it."""
+    import subprocess
+
+    return subprocess
+
+
+@functools.cache
+def _find_powershell_exe() -> str:
+    """
+    Prefer Windows PowerShell if present at the well-known path.
+    Fallback to just 'powershell' (let PATH resolve it).
+
+    Resolved once per process.
+    """
+    windir = os.environ.get("WINDIR", r"C:\Windows")
+    candidate = os.path.join(windir, "System32", "WindowsPowerShell", "v1.0", "powershell.exe")
+    if os.path.isfile(candidate):
+        return candidate
+    return "powershell"
+
+
+@functools.cache
+def _powershell_installed() -> bool:
+    """
+    True if a PowerShell executable can be found (well-known path, else PATH).
+
+    Reuses the cached _find_powershell_exe() result, so the PATH scan happens at
+    most once per process and only when the well-known path is missing.
+    """
+    return _find_powershell_exe() != "powershell" or shutil.which("powershell") is not None
+
+
+def _encode_command(script: str, token: str) -> bytes:
+    """
+    Frame one script as a single stdin line for the host.
+
+    The script runs inside try/catch; the end marker reports whether it succeeded.
+    """
+    encoded = base64.b64encode(script.encode("utf-8")).decode("ascii")
+    line = (
+        "$__gd_ok = $true; "
+        "try { "
+        f"Invoke-Expression ([System.Text.Encoding]::UTF8.GetString([System.Convert]::FromBase64String('{encoded}'))) "
+        "} catch { $__gd_ok = $false }; "
+        f"[Console]::Out.WriteLine('{_END_PREFIX.decode('ascii')}{token}:' + $__gd_ok + '>>'); "
+        "[Console]::Out.Flush()"
+    )
+    return (line + "\n").encode("utf-8")
+
+
+class PSHost:
+    """Singleton wrapper around one resident powershell.exe child process."""
+
+    _instance: Optional["PSHost"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, ps_exe: str) -> None:
+        subprocess = _subprocess()
+        self._proc = subprocess.Popen(
+            [ps_exe, "-NoLogo", "-NoProfile", "-NonInteractive", "-Command", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            creationflags=_CREATE_NO_WINDOW,
+        )
+        self._lines: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self._eval_lock = threading.Lock()
+        self._tokens = itertools.count(1)
+        self._broken = False
+
+        reader = threading.Thread(target=self._pump_stdout, name="guarddog-pshost", daemon=True)
+        reader.start()
+
+        self._send(
+            b"$ErrorActionPreference = 'Stop'; "
+            b"[Console]::OutputEncoding = [System.Text.Encoding]::UTF8\n"
+        )
+
+    @classmethod
+    def instance(cls) -> "PSHost":
+        """Return the shared host, starting it on first use. Raises PSHostUnavailable."""
+        with cls._instance_lock:
+            if cls._instance is not None and not cls._instance._broken:
+                return cls._instance
+
+            try:
+                cls._instance = cls(_find_powershell_exe())
+            except OSError as exc:
+                cls._instance = None
+                raise PSHostUnavailable(f"could not start PowerShell host: {exc!r}") from exc
+            return cls._instance
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Stop the shared host if it is running (registered with atexit)."""
+        with cls._instance_lock:
+            host, cls._instance = cls._instance, None
+        if host is not None:
+            host.close()
+
+    def _pump_stdout(self) -> None:
+        assert self._proc.stdout is not None
+        for raw in self._proc.stdout:
+            self._lines.put(raw)
+        self._lines.put(None)  # EOF: the host exited.
+
+    def _send(self, data: bytes) -> None:
+        assert self._proc.stdin is not None
+        try:
+            self._proc.stdin.write(data)
+            self._proc.stdin.flush()
+        except OSError as exc:
+            self._broken = True
+            raise PSHostUnavailable(f"PowerShell host stdin closed: {exc!r}") from exc
+
+    def eval(self, script: str, timeout_seconds: float = 8) -> bytes | None:
+        """
+        Run one script in the host and return its raw stdout bytes (stripped), or None.
+
+        Returns None when the script failed, printed nothing, or timed out (the
+        host is then killed so a hung cmdlet cannot block later checks).
+        Raises PSHostUnavailable if the host died before answering.
+        """
+        with self._eval_lock:
+            if self._broken:
+                raise PSHostUnavailable("PowerShell host is not running.")
+
+            token = str(next(self._tokens))
+            marker = _END_PREFIX + token.encode("ascii") + b":"
+            self._send(_encode_command(script, token))
+
+            deadline = time.monotonic() + timeout_seconds
+            out_lines: List[bytes] = []
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        raise queue.Empty
+                    raw = self._lines.get(timeout=remaining)
+                except queue.Empty:
+                    self._kill()
+                    return None
+
+                if raw is None:
+                    self._broken = True
+                    raise PSHostUnavailable("PowerShell host exited unexpectedly.")
+
+                # UTF-8 output may start with a BOM; never let it hide the end marker.
+                line = raw.rstrip(b"\r\n").removeprefix(_UTF8_BOM)
+                if line.startswith(marker):
+                    ok = line[len(marker):].startswith(b"True")
+                    break
+                out_lines.append(line)
+
+        if not ok:
+            return None
+        out = b"\n".join(out_lines).strip()
+        return out if out else None
+
+    def _kill(self) -> None:
+        self._broken = True
+        try:
+            self._proc.kill()
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        """Terminate the child process; the instance cannot be used afterwards."""
+        self._broken = True
+        try:
+            if self._proc.stdin is not None:
+                self._proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._proc.wait(timeout=1)
+        except _subprocess().TimeoutExpired:
+            self._kill()
+
+
+atexit.register(PSHost.shutdown)
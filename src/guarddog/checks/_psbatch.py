@@ -0,0 +1,230 @@
+"""Shared PowerShell batch for checks that need PowerShell.
+
+Starting powershell.exe is the slowest part of a GuardDog run (a cold start is
+roughly a quarter of a second), so checks do not launch it themselves.
+Instead, each check registers a small script fragment under its check id at
+import time, and the first check that needs PowerShell data runs every
+registered fragment in ONE PowerShell process.
+
+The combined script emits a single JSON document keyed by check id:
+
+    $results = @{}
+    try { $results['defender'] = (...) } catch { $results['defender'] = $null }
+    ...
+    $results | ConvertTo-Json -Compress -Depth 4
+
+The decoded document is cached for the rest of the run, so later checks reuse
+it instead of starting PowerShell again. A failed or timed-out batch is cached
+as an empty document for the rest of the run too, so the other checks do not
+wait for it again; the next run (see checks.run_all) tries again.
+
+- Non-admin.
+- Read-only.
+- No network access.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from typing import Any, Dict, Optional
+
+from ._ps_host import (
+    _CREATE_NO_WINDOW,
+    PSHost,
+    PSHostUnavailable,
+    _find_powershell_exe,
+    _subprocess,
+)
+
+try:
+    import orjson  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+
+# PowerShell queries normally answer well under a second; a hung cmdlet (e.g. a slow
+# first Defender module load) should not block the whole scan for long.
+DEFAULT_TIMEOUT_SECONDS = 2.0
+_timeout_seconds = DEFAULT_TIMEOUT_SECONDS
+
+# Extra time for a batch on top of the per-fragment budget: the first batch also pays
+# for starting powershell.exe (see _ps_host.py).
+BATCH_STARTUP_ALLOWANCE_SECONDS = 5.0
+
+
+def set_powershell_timeout(seconds: float) -> None:
+    """Override the per-query PowerShell timeout for this process (e.g. from the CLI)."""
+    global _timeout_seconds
+    _timeout_seconds = float(seconds)
+
+
+def _run_powershell_once(script: str, timeout_seconds: float) -> bytes | None:
+    """
+    Run a script in a fresh PowerShell process; fallback when the resident host is unusable.
+    """
+    ps_exe = _find_powershell_exe()
+
+    wrapped = (
+        "$ErrorActionPreference = 'Stop'; "
+        "[Console]::OutputEncoding = [System.Text.Encoding]::UTF8; "
+        + script
+    )
+
+    cmd = [ps_exe, "-NoLogo", "-NoProfile", "-NonInteractive", "-Command", wrapped]
+    subprocess = _subprocess()
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            creationflags=_CREATE_NO_WINDOW,
+        )
+    except Exception:
+        return None
+
+    try:
+        stdout, _ = proc.communicate(timeout=timeout_seconds)
+    except subprocess.TimeoutExpired:
+        # Bail out quickly; callers fall back to the registry or report UNKNOWN.
+        proc.kill()
+        proc.communicate()
+        return None
+
+    if proc.returncode != 0:
+        return None
+
+    out = stdout.strip()
+    return out if out else None
+
+
+def _run_powershell_json(script: str, timeout_seconds: float | None = None) -> bytes | None:
+    """
+    Run a PowerShell script and return raw stdout bytes (expected UTF-8 JSON), or None on failure.
+
+    Uses the resident PowerShell host (see _ps_host.py) so only the first query in a
+    run pays for starting powershell.exe; falls back to a one-shot process if the
+    host cannot be started or dies.
+
+    timeout_seconds defaults to the process-wide setting (see set_powershell_timeout).
+    """
+    if timeout_seconds is None:
+        timeout_seconds = _timeout_seconds
+    try:
+        return PSHost.instance().eval(script, timeout_seconds)
+    except PSHostUnavailable:
+        return _run_powershell_once(script, timeout_seconds)
+
+
+def run_powershell(script: str, timeout_seconds: float | None = None) -> str | None:
+    """
+    Run a PowerShell script (resident host, one-shot fallback) and return its stdout as text.
+
+    For scripts that print plain text rather than JSON; None on failure, timeout, or no output.
+    """
+    out = _run_powershell_json(script, timeout_seconds)
+    if not out:
+        return None
+    return out.removeprefix(b"\xef\xbb\xbf").decode("utf-8", errors="replace")
+
+
+def _loads_json(data: bytes) -> Any:
+    """
+    Decode UTF-8 JSON bytes straight from PowerShell (no separate text decode pass).
+
+    Uses orjson when installed, the standard library otherwise.
+    Raises ValueError on malformed input (json.JSONDecodeError is a subclass).
+    """
+    data = data.removeprefix(b"\xef\xbb\xbf")
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _batch_timeout(snippet_count: int) -> float:
+    """Time budget for one batch: the per-query timeout for each fragment, plus the startup allowance."""
+    return BATCH_STARTUP_ALLOWANCE_SECONDS + _timeout_seconds * snippet_count
+
+
+def _build_batch_script(snippets: Dict[str, str]) -> str:
+    """
+    Combine per-check fragments into one script that prints a JSON object keyed by check id.
+
+    Each fragment runs in its own try/catch so one failing cmdlet (e.g. Defender
+    module missing) does not lose the results of the others.
+    """
+    lines = ["$results = @{}"]
+    for check_id, snippet in snippets.items():
+        lines.append(
+            f"try {{ $results['{check_id}'] = ({snippet}) }} "
+            f"catch {{ $results['{check_id}'] = $null }}"
+        )
+    lines.append("$results | ConvertTo-Json -Compress -Depth 4")
+    return "\n".join(lines)
+
+
+class PowerShellBatch:
+    """
+    Process-wide registry of PowerShell fragments, executed together on first use.
+    checks.run_all resets the cached document at the start of every run.
+
+    Usage from a check module:
+
+        PowerShellBatch.add("defender", "Get-MpComputerStatus | Select-Object ...")
+        data = PowerShellBatch.get("defender")   # None if unavailable
+    """
+
+    _snippets: Dict[str, str] = {}
+    _results: Optional[Dict[str, Any]] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def add(cls, check_id: str, ps_snippet: str) -> None:
+        """Register (or replace) the PowerShell fragment for a check id."""
+        with cls._lock:
+            cls._snippets[check_id] = ps_snippet.strip()
+            # A new fragment means any cached document is incomplete.
+            cls._results = None
+
+    @classmethod
+    def run(cls) -> Dict[str, Any]:
+        """
+        Execute all registered fragments in one PowerShell process (once per run).
+
+        Returns the decoded JSON object keyed by check id, or an empty dict if
+        PowerShell is unavailable, timed out, or returned nothing usable. A failure
+        is cached too (as the empty dict) until `reset()`, so checks waiting on the
+        lock do not each run the batch again.
+        """
+        with cls._lock:
+            if cls._results is None:
+                cls._results = cls._execute(dict(cls._snippets))
+            return cls._results
+
+    @classmethod
+    def get(cls, check_id: str) -> Any:
+        """Return the decoded result for one check id, or None if missing."""
+        return cls.run().get(check_id)
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forget cached results so the next `get()` runs PowerShell again."""
+        with cls._lock:
+            cls._results = None
+
+    @staticmethod
+    def _execute(snippets: Dict[str, str]) -> Dict[str, Any]:
+        if not snippets:
+            return {}
+
+        out = _run_powershell_json(_build_batch_script(snippets), _batch_timeout(len(snippets)))
+        if not out:
+            return {}
+
+        try:
+            data = _loads_json(out)
+        except ValueError:
+            return {}
+
+        return data if isinstance(data, dict) else {}
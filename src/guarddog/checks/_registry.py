@@ -0,0 +1,316 @@
+"""Shared registry helpers for checks that read HKLM (and HKCU).
+
+Opened subkeys are cached for the life of the process (and closed at exit), so
+each subkey is opened at most once no matter how many values or checks read it.
+A subkey that cannot be opened is not cached: it is tried again on the next read,
+so a key created later (e.g. by a policy applied after the first run) is picked up.
+A cached handle whose key was deleted (and possibly recreated, e.g. during a GPO
+refresh) is dropped and the subkey reopened once (see _read_values).
+Decoded values are cached too and reused while the key's last-write time is
+unchanged (see _read_values).
+
+winreg is imported lazily on first use (see load_winreg), so importing the checks
+package stays cheap; on non-Windows Python the readers are bound to no-ops that
+report every value as missing, and callers fall back to UNKNOWN.
+
+- Non-admin.
+- Read-only.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import sys
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+@functools.cache
+def load_winreg():
+    """Import winreg on first use; None when not running on Windows Python."""
+    try:
+        import winreg  # type: ignore[attr-defined]
+    except ImportError:  # pragma: no cover
+        return None
+    return winreg
+
+
+def winreg_available() -> bool:
+    return load_winreg() is not None
+
+
+@functools.cache
+def _read_access() -> int:
+    """
+    Access mask for opening keys: KEY_READ pinned to the native 64-bit view.
+
+    Without KEY_WOW64_64KEY, 32-bit Python on 64-bit Windows is redirected to
+    Wow6432Node and can miss the real HKLM\\SYSTEM / SOFTWARE values.
+    """
+    winreg = load_winreg()
+    return winreg.KEY_READ | getattr(winreg, "KEY_WOW64_64KEY", 0)
+
+
+# winreg.HKEY_CURRENT_USER, spelled out so callers need not import winreg for it.
+HKEY_CURRENT_USER = 0x80000001
+
+_hklm_handle = None
+_hklm_lock = threading.Lock()
+
+
+def hklm():
+    """
+    Return a process-wide HKLM handle (winreg.ConnectRegistry), opened once.
+
+    Reusing one handle avoids re-resolving the predefined HKEY_LOCAL_MACHINE key
+    on every read. Falls back to the predefined key if ConnectRegistry fails,
+    and returns None when winreg is unavailable.
+    """
+    global _hklm_handle
+    winreg = load_winreg()
+    if winreg is None:
+        return None
+
+    with _hklm_lock:
+        if _hklm_handle is None:
+            try:
+                _hklm_handle = winreg.ConnectRegistry(None, winreg.HKEY_LOCAL_MACHINE)
+            except OSError:
+                return winreg.HKEY_LOCAL_MACHINE
+        return _hklm_handle
+
+
+# (root, subkey) -> open key handle. Failed opens are not stored.
+_key_cache: Dict[Tuple[int, str], Any] = {}
+_key_cache_lock = threading.Lock()
+
+
+def _open_key_cached(root, subkey: str):
+    """Open `root\\subkey` for reading once and reuse the handle; None if it cannot be opened."""
+    if root is None:
+        return None
+
+    winreg = load_winreg()
+    cache_key = (int(root), subkey.lower())
+    with _key_cache_lock:
+        key = _key_cache.get(cache_key)
+        if key is None:
+            try:
+                key = winreg.OpenKey(root, subkey, 0, _read_access())
+            except OSError:
+                return None
+            _key_cache[cache_key] = key
+        return key
+
+
+def _evict_key(root, subkey: str, key) -> None:
+    """Drop and close a cached handle that no longer works (its key was deleted)."""
+    cache_key = (int(root), subkey.lower())
+    with _key_cache_lock:
+        if _key_cache.get(cache_key) is key:
+            del _key_cache[cache_key]
+    try:
+        key.Close()
+    except OSError:
+        pass
+
+
+def close_cached_keys() -> None:
+    """Close every cached key handle (registered with atexit)."""
+    with _key_cache_lock:
+        for key in _key_cache.values():
+            try:
+                key.Close()
+            except OSError:
+                pass
+        _key_cache.clear()
+
+
+atexit.register(close_cached_keys)
+
+
+# RegGetValueW flags restricting the read to REG_DWORD / REG_QWORD (winreg.h); other types fail the call.
+RRF_RT_REG_DWORD = 0x00000010
+RRF_RT_REG_QWORD = 0x00000040
+ERROR_SUCCESS = 0
+
+# Value types accepted by the readers (fixed winreg.h numbers, so winreg need not be
+# imported to build them). REG_DWORD_LITTLE_ENDIAN is REG_DWORD; some sysprep'd images
+# store these flags as REG_QWORD, which is accepted rather than reported as missing.
+_REG_SZ, _REG_EXPAND_SZ, _REG_DWORD, _REG_QWORD = 1, 2, 4, 11
+_INTEGER_TYPES = frozenset({_REG_DWORD, _REG_QWORD})
+_STRING_TYPES = frozenset({_REG_SZ, _REG_EXPAND_SZ})
+
+
+@functools.cache
+def _reg_get_value_w():
+    """advapi32!RegGetValueW with its signature set; None when not on Windows."""
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        func = ctypes.WinDLL("advapi32").RegGetValueW  # type: ignore[attr-defined]
+    except (ImportError, AttributeError, OSError):
+        return None
+
+    func.argtypes = [
+        wintypes.HKEY,
+        wintypes.LPCWSTR,
+        wintypes.LPCWSTR,
+        wintypes.DWORD,
+        wintypes.LPDWORD,
+        ctypes.c_void_p,
+        wintypes.LPDWORD,
+    ]
+    func.restype = wintypes.LONG
+    return func
+
+
+def _reg_get_dword(reg_get_value_w, key, value_name: str) -> Optional[int]:
+    """
+    Read one REG_DWORD / REG_QWORD from an open key with RegGetValueW into an 8-byte buffer.
+
+    The type is enforced by the API (RRF_RT_REG_DWORD | RRF_RT_REG_QWORD), so no Python-side
+    value/type tuple is built; a DWORD fills the low half of the zeroed buffer.
+    None if the value is missing or of another type.
+    """
+    import ctypes
+    from ctypes import wintypes
+
+    data = ctypes.c_uint64(0)
+    size = wintypes.DWORD(ctypes.sizeof(data))
+    rc = reg_get_value_w(
+        int(key),
+        None,
+        value_name,
+        RRF_RT_REG_DWORD | RRF_RT_REG_QWORD,
+        None,
+        ctypes.byref(data),
+        ctypes.byref(size),
+    )
+    return int(data.value) if rc == ERROR_SUCCESS else None
+
+
+def _query_dwords(key, names: Tuple[str, ...]) -> Dict[str, Optional[int]]:
+    result: Dict[str, Optional[int]] = dict.fromkeys(names)
+
+    reg_get_value_w = _reg_get_value_w()
+    if reg_get_value_w is not None:
+        for name in names:
+            result[name] = _reg_get_dword(reg_get_value_w, key, name)
+        return result
+
+    winreg = load_winreg()
+    for name in names:
+        try:
+            value, reg_type = winreg.QueryValueEx(key, name)
+        except OSError:
+            continue
+        if reg_type in _INTEGER_TYPES:
+            result[name] = int(value)
+
+    return result
+
+
+def _query_strings(key, names: Tuple[str, ...]) -> Dict[str, Optional[str]]:
+    result: Dict[str, Optional[str]] = dict.fromkeys(names)
+
+    winreg = load_winreg()
+    for name in names:
+        try:
+            value, reg_type = winreg.QueryValueEx(key, name)
+        except OSError:
+            continue
+        if reg_type in _STRING_TYPES:
+            result[name] = str(value).strip()
+
+    return result
+
+
+# (root, subkey, reader, names) -> (key last-write time, decoded values). A key's last-write
+# time changes whenever any of its values is written, so an unchanged time means the cached
+# values are still current and one RegQueryInfoKey replaces a query per value.
+_values_cache: Dict[Tuple[int, str, str, Tuple[str, ...]], Tuple[int, Dict[str, Any]]] = {}
+_values_cache_lock = threading.Lock()
+
+
+def clear_values_cache() -> None:
+    """
+    Forget all cached decoded values and close the cached key handles
+    (the next read reopens its subkey and queries the registry again).
+    """
+    close_cached_keys()
+    with _values_cache_lock:
+        _values_cache.clear()
+
+
+def _last_write_time(key) -> Optional[int]:
+    try:
+        return load_winreg().QueryInfoKey(key)[2]
+    except OSError:
+        return None
+
+
+def _read_values(root, subkey: str, names: Iterable[str], query) -> Dict[str, Any]:
+    """Open `root\\subkey` (cached handle) and decode `names` with `query`, reusing unchanged results."""
+    names = tuple(names)
+    key = _open_key_cached(root, subkey)
+    if key is None:
+        return dict.fromkeys(names)
+
+    cache_key = (int(root), subkey.lower(), query.__name__, names)
+    last_write = _last_write_time(key)
+    if last_write is None:
+        # A deleted key fails every query on the old handle (ERROR_KEY_DELETED), even
+        # after it is recreated: reopen once before giving up.
+        _evict_key(root, subkey, key)
+        key = _open_key_cached(root, subkey)
+        if key is None:
+            return dict.fromkeys(names)
+        last_write = _last_write_time(key)
+
+    if last_write is not None:
+        with _values_cache_lock:
+            cached = _values_cache.get(cache_key)
+        if cached is not None and cached[0] == last_write:
+            return dict(cached[1])
+
+    values = query(key, names)
+    if last_write is not None:
+        with _values_cache_lock:
+            _values_cache[cache_key] = (last_write, values)
+    return dict(values)
+
+
+def read_dwords(root, subkey: str, names: Iterable[str]) -> Dict[str, Optional[int]]:
+    """
+    Read several REG_DWORD (or REG_QWORD) values under one subkey, opening the subkey at most once.
+
+    Returns name -> int, or None for values that are missing or of another type.
+    """
+    return _read_values(root, subkey, names, _query_dwords)
+
+
+def read_dword(root, subkey: str, value_name: str) -> Optional[int]:
+    """Read a single REG_DWORD (or REG_QWORD) value; None if missing, another type, or on error."""
+    return read_dwords(root, subkey, (value_name,))[value_name]
+
+
+def read_strings(root, subkey: str, names: Iterable[str]) -> Dict[str, Optional[str]]:
+    """
+    Read several REG_SZ / REG_EXPAND_SZ values under one subkey, opening the subkey at most once.
+
+    Returns name -> stripped string, or None for values that are missing or not strings.
+    """
+    return _read_values(root, subkey, names, _query_strings)
+
+
+if sys.platform != "win32":
+    # No registry off Windows: bind the readers to no-ops once, so no call goes
+    # through load_winreg() / the key cache just to find out winreg is missing.
+    def read_dwords(root, subkey: str, names: Iterable[str]) -> Dict[str, Optional[int]]:  # noqa: F811
+        return dict.fromkeys(names)
+
+    def read_strings(root, subkey: str, names: Iterable[str]) -> Dict[str, Optional[str]]:  # noqa: F811
+        return dict.fromkeys(names)
@@ -5,36 +5,46 @@ Goal:
 - Determine whether Microsoft Defender real-time protection is enabled.
 
 Primary method:
-- PowerShell: Get-MpComputerStatus (most accurate when available)
+- Registry: DisableRealtimeMonitoring flags (local + policy), read directly with winreg
 
-Fallback method:
-- Registry heuristic: DisableRealtimeMonitoring flags (best-effort only)
+Fallback methods (only when neither registry value exists):
+- WMI: MSFT_MpComputerStatus queried in-process over COM (needs the optional pywin32 package)
+- PowerShell: Get-MpComputerStatus, run inside the shared PowerShell batch so it does
+  not cost a separate powershell.exe start
 
 Important:
-- Registry flags are not always a perfect reflection of the effective state on modern Windows.
-- For MVP, we treat registry as a fallback indicator only.
+- Registry flags are not always a perfect reflection of the effective state on modern Windows,
+  but when they are set they are cheap to read and usually decisive.
 """
 
 from __future__ import annotations
 
-import json
-import os
-import subprocess
 from dataclasses import dataclass
-from typing import Tuple, Optional
+from types import MappingProxyType
+from typing import Tuple
 
-try:
-    import winreg  # type: ignore[attr-defined]
-except ImportError:  # pragma: no cover
-    winreg = None  # type: ignore[assignment]
+from ._com import com_scope
+from ._psbatch import PowerShellBatch
+from ._registry import hklm, read_dword, winreg_available
 
 
 BASE_KEY_PATH = r"SOFTWARE\Microsoft\Windows Defender\Real-Time Protection"
 POLICY_KEY_PATH = r"SOFTWARE\Policies\Microsoft\Windows Defender\Real-Time Protection"
 VALUE_NAME = "DisableRealtimeMonitoring"
 
+STATUS_PROPERTIES = ("AMServiceEnabled", "AntivirusEnabled", "RealTimeProtectionEnabled")
+WMI_NAMESPACE = r"winmgmts:\\.\root\Microsoft\Windows\Defender"
+WMI_QUERY = f"SELECT {','.join(STATUS_PROPERTIES)} FROM MSFT_MpComputerStatus"
 
-@dataclass
+# Runs inside the shared PowerShell batch (see _psbatch.py) together with other checks.
+PowerShellBatch.add(
+    "defender",
+    "Get-MpComputerStatus | Select-Object -Property "
+    "AMServiceEnabled,AntivirusEnabled,RealTimeProtectionEnabled",
+)
+
+
+@dataclass(frozen=True, slots=True)
 class DefenderState:
     # Core fields (tests already use these)
     disabled_local: bool | None
@@ -50,57 +60,33 @@ class DefenderState:
     error: str | None = None
 
 
-def _find_powershell_exe() -> str:
-    windir = os.environ.get("WINDIR", r"C:\Windows")
-    candidate = os.path.join(windir, "System32", "WindowsPowerShell", "v1.0", "powershell.exe")
-    if os.path.isfile(candidate):
-        return candidate
-    return "powershell"
-
-
-def _run_powershell_json(script: str, timeout_seconds: int = 8) -> str | None:
-    ps_exe = _find_powershell_exe()
-    wrapped = (
-        "$ErrorActionPreference = 'Stop'; "
-        "[Console]::OutputEncoding = [System.Text.Encoding]::UTF8; "
-        + script
-    )
-    cmd = [ps_exe, "-NoLogo", "-NoProfile", "-NonInteractive", "-Command", wrapped]
-    try:
-        proc = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            timeout=timeout_seconds,
-            stdin=subprocess.DEVNULL,
-            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
-        )
-    except Exception:
-        return None
+def _query_defender_wmi() -> dict | None:
+    """
+    Query MSFT_MpComputerStatus in-process over COM, avoiding a PowerShell round trip.
 
-    if proc.returncode != 0:
-        return None
+    Returns None when pywin32 is not installed or the query fails.
+    """
+    # COM is normally already initialized for this worker thread by checks.run_all.
+    # The service object is not cached because COM objects belong to the
+    # apartment that created them.
+    with com_scope() as com_ready:
+        if not com_ready:
+            return None
+        try:
+            import win32com.client  # type: ignore[import-not-found]
 
-    out = proc.stdout.strip()
-    return out if out else None
+            service = win32com.client.GetObject(WMI_NAMESPACE)
+            rows = list(service.ExecQuery(WMI_QUERY))
+            if not rows:
+                return None
+            return {prop: getattr(rows[0], prop, None) for prop in STATUS_PROPERTIES}
+        except Exception:  # noqa: BLE001
+            return None
 
 
 def _query_defender_powershell() -> dict | None:
-    ps_script = r"""
-    $obj = Get-MpComputerStatus | Select-Object -Property `
-      AMServiceEnabled,AntivirusEnabled,RealTimeProtectionEnabled
-    $obj | ConvertTo-Json -Compress
-    """.strip()
-
-    out = _run_powershell_json(ps_script)
-    if not out:
-        return None
-
-    try:
-        data = json.loads(out)
-    except json.JSONDecodeError:
+    data = PowerShellBatch.get("defender")
+    if data is None:
         return None
 
     if isinstance(data, list):
@@ -111,22 +97,50 @@ def _query_defender_powershell() -> dict | None:
     return data if isinstance(data, dict) else None
 
 
-def _read_registry_dword(root, subkey: str, value_name: str) -> int | None:
-    if winreg is None:
-        return None
-    try:
-        with winreg.OpenKey(root, subkey, 0, winreg.KEY_READ) as key:
-            value, reg_type = winreg.QueryValueEx(key, value_name)
-            if reg_type != winreg.REG_DWORD:
-                return None
-            return int(value)
-    except OSError:
-        return None
+def _get_defender_state() -> DefenderState:
+    # 1) Registry path (preferred: no process start)
+    local_val: int | None = None
+    policy_val: int | None = None
+    has_winreg = winreg_available()
+    if has_winreg:
+        root = hklm()
+
+        # Group Policy disabling real-time protection is authoritative; nothing else can
+        # change the outcome, so skip the remaining reads.
+        policy_val = read_dword(root, POLICY_KEY_PATH, VALUE_NAME)
+        if policy_val == 1:
+            return DefenderState(
+                disabled_local=None,
+                disabled_policy=True,
+                data_source="registry-policy-fast-path",
+                error=None,
+            )
+
+        local_val = read_dword(root, BASE_KEY_PATH, VALUE_NAME)
 
+    def interp(v: int | None) -> bool | None:
+        if v is None:
+            return None
+        return v == 1  # 1 -> disabled, 0 -> not disabled
+
+    if local_val is not None or policy_val is not None:
+        return DefenderState(
+            disabled_local=interp(local_val),
+            disabled_policy=interp(policy_val),
+            am_service_enabled=None,
+            antivirus_enabled=None,
+            rtp_enabled=None,
+            data_source="registry",
+            error=None,
+        )
+
+    # 2) WMI in-process, then PowerShell (shared batch), only when the registry has no answer
+    data = _query_defender_wmi()
+    source = "wmi"
+    if data is None:
+        data = _query_defender_powershell()
+        source = "powershell"
 
-def _get_defender_state() -> DefenderState:
-    # 1) PowerShell path (preferred)
-    data = _query_defender_powershell()
     if data is not None:
         rtp = data.get("RealTimeProtectionEnabled")
         ams = data.get("AMServiceEnabled")
@@ -150,40 +164,65 @@ def _get_defender_state() -> DefenderState:
             am_service_enabled=am_service_enabled,
             antivirus_enabled=antivirus_enabled,
             rtp_enabled=rtp_enabled,
-            data_source="powershell",
+            data_source=source,
             error=None,
         )
 
-    # 2) Registry fallback (heuristic)
-    if winreg is None:
-        return DefenderState(
-            disabled_local=None,
-            disabled_policy=None,
-            am_service_enabled=None,
-            antivirus_enabled=None,
-            rtp_enabled=None,
-            data_source="none",
-            error="winreg unavailable (not running on Windows Python).",
-        )
-
-    root = winreg.HKEY_LOCAL_MACHINE
-    local_val = _read_registry_dword(root, BASE_KEY_PATH, VALUE_NAME)
-    policy_val = _read_registry_dword(root, POLICY_KEY_PATH, VALUE_NAME)
-
-    def interp(v: int | None) -> bool | None:
-        if v is None:
-            return None
-        return v == 1  # 1 -> disabled, 0 -> not disabled
-
     return DefenderState(
-        disabled_local=interp(local_val),
-        disabled_policy=interp(policy_val),
+        disabled_local=None,
+        disabled_policy=None,
         am_service_enabled=None,
         antivirus_enabled=None,
         rtp_enabled=None,
-        data_source="registry",
-        error=None,
+        data_source="none",
+        error=None if has_winreg else "winreg unavailable (not running on Windows Python).",
+    )
+
+
+# disabled_local / disabled_policy -> detail line
+_LOCAL_DETAIL = {
+    True: "- Local setting: real-time protection is DISABLED.",
+    False: "- Local setting: real-time protection is NOT disabled.",
+    None: "- Local setting: real-time protection status is UNKNOWN.",
+}
+_POLICY_DETAIL = {
+    True: "- Policy: real-time protection is DISABLED by policy.",
+    False: "- Policy: real-time protection is NOT disabled by policy.",
+    None: "- Policy: real-time protection policy status is UNKNOWN.",
+}
+
+
+# (disabled_local, disabled_policy) -> status. Any "disabled" wins; otherwise any
+# "not disabled" hint means OK; with no information at all the status is UNKNOWN.
+_DEFENDER_STATUS = {
+    (local, policy): (
+        "HIGH" if True in (local, policy) else "OK" if False in (local, policy) else "UNKNOWN"
     )
+    for local in (True, False, None)
+    for policy in (True, False, None)
+}
+
+# status -> (summary, remediation)
+_DEFENDER_DECISIONS = {
+    "HIGH": (
+        "Microsoft Defender real-time protection appears to be turned OFF. "
+        "This makes it easier for malware to run without being noticed.",
+        "Open Windows Security → 'Virus & threat protection' → 'Manage settings' and turn real-time protection ON. "
+        "If you use another antivirus product, confirm it is active and up to date.",
+    ),
+    "OK": (
+        "Microsoft Defender real-time protection appears to be turned ON "
+        "(it is not marked as disabled in local or policy settings).",
+        "No action needed. You can confirm this in Windows Security → 'Virus & threat protection'.",
+    ),
+    "UNKNOWN": (
+        "GuardDog could not find clear settings for Microsoft Defender real-time protection. "
+        "This can happen if another antivirus product is managing protection, or if this "
+        "Windows version stores these settings differently.",
+        "GuardDog could not clearly read Defender’s status. Open Windows Security → 'Virus & threat protection' "
+        "and confirm real-time protection (or another antivirus product) is active.",
+    ),
+}
 
 
 def _classify_defender_state(state: DefenderState) -> Tuple[str, str, str]:
@@ -195,59 +234,21 @@ def _classify_defender_state(state: DefenderState) -> Tuple[str, str, str]:
 
     Note: unit tests expect specific wording in summary/details.
     """
-    detail_lines: list[str] = []
-
     # Always include local/policy interpretation if we have it, regardless of data_source.
-    if state.disabled_local is True:
-        detail_lines.append("- Local setting: real-time protection is DISABLED.")
-    elif state.disabled_local is False:
-        detail_lines.append("- Local setting: real-time protection is NOT disabled.")
-    else:
-        detail_lines.append("- Local setting: real-time protection status is UNKNOWN.")
-
-    if state.disabled_policy is True:
-        detail_lines.append("- Policy: real-time protection is DISABLED by policy.")
-    elif state.disabled_policy is False:
-        detail_lines.append("- Policy: real-time protection is NOT disabled by policy.")
-    else:
-        detail_lines.append("- Policy: real-time protection policy status is UNKNOWN.")
+    details = f"{_LOCAL_DETAIL[state.disabled_local]}\n{_POLICY_DETAIL[state.disabled_policy]}"
 
     # Optional metadata (nice to have)
     if getattr(state, "data_source", None):
-        detail_lines.append(f"- Data source: {state.data_source}")
+        details += f"\n- Data source: {state.data_source}"
     if getattr(state, "error", None):
-        detail_lines.append(f"- Error: {state.error}")
-
-    details = "\n".join(detail_lines)
-
-    # Classification logic
-    any_disabled = (state.disabled_local is True) or (state.disabled_policy is True)
-    any_enabled_hint = (state.disabled_local is False) or (state.disabled_policy is False)
-
-    if any_disabled:
-        status = "HIGH"
-        summary = (
-            "Microsoft Defender real-time protection appears to be turned OFF. "
-            "This makes it easier for malware to run without being noticed."
-        )
-        return status, summary, details
+        details += f"\n- Error: {state.error}"
 
-    if any_enabled_hint:
-        status = "OK"
-        summary = (
-            "Microsoft Defender real-time protection appears to be turned ON "
-            "(it is not marked as disabled in local or policy settings)."
-        )
-        return status, summary, details
+    status = _DEFENDER_STATUS[(state.disabled_local, state.disabled_policy)]
+    return status, _DEFENDER_DECISIONS[status][0], details
 
-    status = "UNKNOWN"
-    summary = (
-        "GuardDog could not find clear settings for Microsoft Defender real-time protection. "
-        "This can happen if another antivirus product is managing protection, or if this "
-        "Windows version stores these settings differently."
-    )
-    return status, summary, details
 
+# Constant part of every result dict (read-only so it cannot be mutated by a caller).
+_RESULT_BASE = MappingProxyType({"id": "defender", "title": "Microsoft Defender"})
 
 
 def run():
@@ -260,8 +261,7 @@ def run():
         status, summary, details = _classify_defender_state(state)
     except Exception as exc:  # noqa: BLE001
         return {
-            "id": "defender",
-            "title": "Microsoft Defender",
+            **_RESULT_BASE,
             "status": "UNKNOWN",
             "summary": "GuardDog could not read the Microsoft Defender settings due to an internal error.",
             "details": f"Error: {exc!r}",
@@ -270,24 +270,10 @@ def run():
             ),
         }
 
-    if status == "OK":
-        remediation = (
-            "No action needed. You can confirm this in Windows Security → 'Virus & threat protection'."
-        )
-    elif status == "HIGH":
-        remediation = (
-            "Open Windows Security → 'Virus & threat protection' → 'Manage settings' and turn real-time protection ON. "
-            "If you use another antivirus product, confirm it is active and up to date."
-        )
-    else:
-        remediation = (
-            "GuardDog could not clearly read Defender’s status. Open Windows Security → 'Virus & threat protection' "
-            "and confirm real-time protection (or another antivirus product) is active."
-        )
+    remediation = _DEFENDER_DECISIONS[status][1]
 
     return {
-        "id": "defender",
-        "title": "Microsoft Defender",
+        **_RESULT_BASE,
         "status": status,
         "summary": summary,
         "details": details,
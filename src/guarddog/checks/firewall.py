@@ -1,10 +1,13 @@
 """Firewall status checks (Windows Defender Firewall).
 
 Primary method:
-- netsh advfirewall show allprofiles (best effort, but locale-dependent)
+- Registry reads for EnableFirewall under FirewallPolicy profile keys
+  (no process start, locale-agnostic)
 
-Fallback method:
-- Registry reads for EnableFirewall under FirewallPolicy profile keys (locale-agnostic)
+Fallback methods (only when a profile cannot be resolved from the registry):
+- COM: HNetCfg.FwPolicy2, queried in-process (needs the optional pywin32 package)
+- PowerShell: Get-NetFirewallProfile, run inside the shared PowerShell batch
+- netsh advfirewall show allprofiles (only when PowerShell is not installed; locale-dependent)
 
 - Non-admin.
 - Read-only.
@@ -13,85 +16,170 @@ Fallback method:
 
 from __future__ import annotations
 
+import functools
+import itertools
 import os
-import subprocess
-from typing import Dict, Tuple, Optional
+import re
+from types import MappingProxyType
+from typing import Any, Dict, Tuple, Optional, Union
 
-import winreg
+from ._cache import ttl_cache
+from ._com import com_scope
+from ._ps_host import _CREATE_NO_WINDOW, _powershell_installed, _subprocess
+from ._psbatch import PowerShellBatch
+from ._registry import hklm, read_dword, winreg_available
 
 
-_NETSH_PATH = os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "System32", "netsh.exe")
+# Runs inside the shared PowerShell batch (see _psbatch.py) together with other checks.
+# Enabled is a GpoBoolean enum; cast to string so JSON carries "True"/"False"/"NotConfigured".
+PowerShellBatch.add(
+    "firewall",
+    "Get-NetFirewallProfile -All | "
+    "Select-Object -Property Name,@{Name='Enabled';Expression={[string]$_.Enabled}}",
+)
 
 
-def _run_netsh_allprofiles(timeout_seconds: int = 8) -> str:
+@functools.cache
+def _netsh_exe() -> str:
     """
-    Run `netsh advfirewall show allprofiles` and return stdout as text.
+    Prefer netsh.exe at its absolute System32 path (reduces binary-hijack risk).
+    Fallback to just 'netsh' (let PATH resolve it). Resolved once per process.
+    """
+    candidate = os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "System32", "netsh.exe")
+    if os.path.isfile(candidate):
+        return candidate
+    return "netsh"
+
+
+@ttl_cache()
+def _run_netsh_allprofiles(timeout_seconds: int = 8) -> bytes:
+    """
+    Run `netsh advfirewall show allprofiles` and return raw stdout bytes.
+
+    The output is not decoded here: the parser matches ASCII keywords directly on the
+    bytes and only decodes as a fallback (see _parse_netsh_allprofiles).
 
     - Uses absolute path to netsh.exe to reduce binary-hijack risk.
     - Uses a timeout to avoid hangs.
     """
+    subprocess = _subprocess()
     proc = subprocess.run(
-        [_NETSH_PATH, "advfirewall", "show", "allprofiles"],
+        [_netsh_exe(), "advfirewall", "show", "allprofiles"],
         capture_output=True,
-        text=True,                  # use system default encoding for this host
-        errors="replace",
         timeout=timeout_seconds,
         stdin=subprocess.DEVNULL,
-        creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        creationflags=_CREATE_NO_WINDOW,
     )
     if proc.returncode != 0:
         raise RuntimeError(
-            f"netsh advfirewall failed with code {proc.returncode}: {proc.stderr.strip()}"
+            f"netsh advfirewall failed with code {proc.returncode}: "
+            f"{proc.stderr.decode(errors='replace').strip()}"
         )
     return proc.stdout
 
 
-def _parse_netsh_allprofiles(output: str) -> Dict[str, str]:
+# "<Profile> Profile Settings:" header followed by that section's "State <value>" line.
+# The section body is skipped a whole line at a time (one lookahead per line rather than
+# per character), and a line holding the next header ends the section, so a section
+# without a State line cannot borrow the next profile's state.
+_PROFILE_PATTERN = (
+    r"(domain|private|public)[ \t]+profile[ \t]+settings[^\n]*\n"
+    r"(?:(?![^\n]*profile[ \t]+settings)[^\n]*\n)*?"
+    r"[ \t]*state[ \t]+(\S+)"
+)
+_PROFILE_RE = re.compile(_PROFILE_PATTERN, re.IGNORECASE)
+# Same pattern for raw netsh stdout (the keywords are ASCII in any ASCII-compatible codepage).
+_PROFILE_RE_BYTES = re.compile(_PROFILE_PATTERN.encode("ascii"), re.IGNORECASE)
+
+
+def _parse_netsh_allprofiles(output: bytes | str) -> Dict[str, str]:
     """
     Parse netsh output for firewall State lines (English only).
 
+    Accepts raw stdout bytes or text. Bytes are matched without decoding; only when
+    that finds nothing are they decoded with the system encoding and parsed again.
+
     Returns profile -> state ("ON"/"OFF"/other).
     """
     profiles: Dict[str, str] = {}
-    current_profile: Optional[str] = None
 
-    for raw_line in output.splitlines():
-        line = raw_line.strip()
-        if not line:
-            continue
+    if isinstance(output, bytes):
+        for match in _PROFILE_RE_BYTES.finditer(output):
+            profile, state = match.group(1, 2)
+            profiles[profile.decode("ascii").lower()] = state.decode("ascii", "replace").upper()
+            if len(profiles) == 3:
+                break
+        if profiles:
+            return profiles
 
-        lower = line.lower()
+        import locale
 
-        if "domain profile settings" in lower:
-            current_profile = "domain"
-            continue
-        if "private profile settings" in lower:
-            current_profile = "private"
-            continue
-        if "public profile settings" in lower:
-            current_profile = "public"
-            continue
+        return _parse_netsh_allprofiles(output.decode(locale.getpreferredencoding(False), "replace"))
+
+    for match in _PROFILE_RE.finditer(output):
+        profiles[match.group(1).lower()] = match.group(2).upper()
+        if len(profiles) == 3:
+            break
+
+    return profiles
+
+
+def _parse_ps_firewall_profiles(data: Any) -> Dict[str, str]:
+    """
+    Map Get-NetFirewallProfile output ({Name, Enabled} objects) to profile -> state.
+
+    Returns profile -> "ON"/"OFF"/"UNKNOWN(...)", or an empty dict if nothing usable.
+    """
+    if isinstance(data, dict):
+        items = [data]
+    elif isinstance(data, list):
+        items = [x for x in data if isinstance(x, dict)]
+    else:
+        return {}
 
-        if current_profile is None:
+    profiles: Dict[str, str] = {}
+    for item in items:
+        name = item.get("Name")
+        if not isinstance(name, str) or name.strip().lower() not in ("domain", "private", "public"):
             continue
 
-        if lower.startswith("state"):
-            parts = line.split()
-            if len(parts) >= 2:
-                profiles[current_profile] = parts[-1].upper()
+        enabled = item.get("Enabled")
+        enabled_text = str(enabled).strip().lower()
+        if enabled is True or enabled_text in ("true", "1"):
+            state = "ON"
+        elif enabled is False or enabled_text in ("false", "0"):
+            state = "OFF"
+        else:
+            state = f"UNKNOWN({enabled})"
+        profiles[name.strip().lower()] = state
 
     return profiles
 
 
-def _read_reg_dword(root, path: str, name: str) -> Optional[int]:
-    try:
-        with winreg.OpenKey(root, path, 0, winreg.KEY_READ) as key:
-            value, vtype = winreg.QueryValueEx(key, name)
-            if vtype == winreg.REG_DWORD:
-                return int(value)
-    except OSError:
-        return None
-    return None
+# NET_FW_PROFILE_TYPE2 bit for each profile, as taken by INetFwPolicy2.FirewallEnabled.
+_FW_PROFILE_TYPES = {"domain": 1, "private": 2, "public": 4}
+
+
+def _query_fw_policy2() -> Dict[str, bool]:
+    """
+    Ask the firewall service directly via the HNetCfg.FwPolicy2 COM object (no process start).
+
+    Returns profile -> bool, or an empty dict when pywin32 is not installed or the query fails.
+    """
+    # COM is normally already initialized for this worker thread by checks.run_all.
+    with com_scope() as com_ready:
+        if not com_ready:
+            return {}
+        try:
+            import win32com.client  # type: ignore[import-not-found]
+
+            fw = win32com.client.Dispatch("HNetCfg.FwPolicy2")
+            return {
+                profile: bool(fw.FirewallEnabled(profile_type))
+                for profile, profile_type in _FW_PROFILE_TYPES.items()
+            }
+        except Exception:  # noqa: BLE001
+            return {}
 
 
 def _registry_firewall_states() -> Dict[str, str]:
@@ -104,6 +192,8 @@ def _registry_firewall_states() -> Dict[str, str]:
     Returns profile -> "ON"/"OFF"/"UNKNOWN".
     """
     result: Dict[str, str] = {}
+    if not winreg_available():
+        return result
 
     # Policy path (can override/represent enforced settings)
     policy_base = r"SOFTWARE\Policies\Microsoft\WindowsFirewall"
@@ -121,10 +211,12 @@ def _registry_firewall_states() -> Dict[str, str]:
         "public": ops_base + r"\PublicProfile",
     }
 
+    root = hklm()
     for profile in ("domain", "private", "public"):
-        enabled = _read_reg_dword(winreg.HKEY_LOCAL_MACHINE, policy_profiles[profile], "EnableFirewall")
+        # Each subkey is opened at most once per process (see _registry.read_dword).
+        enabled = read_dword(root, policy_profiles[profile], "EnableFirewall")
         if enabled is None:
-            enabled = _read_reg_dword(winreg.HKEY_LOCAL_MACHINE, ops_profiles[profile], "EnableFirewall")
+            enabled = read_dword(root, ops_profiles[profile], "EnableFirewall")
 
         if enabled is None:
             result[profile] = "UNKNOWN"
@@ -138,7 +230,61 @@ def _registry_firewall_states() -> Dict[str, str]:
     return result
 
 
-def _classify_firewall_status(profile_states: Dict[str, str]) -> Tuple[str, str, str]:
+_FIREWALL_DETAILS = (
+    "- Domain profile: {domain}\n"
+    "- Private profile: {private}\n"
+    "- Public profile: {public}"
+)
+
+
+# Per-profile state codes used as classification table keys.
+_OFF, _ON, _UNKNOWN, _OTHER, _MISSING = range(5)
+
+_FIREWALL_PROFILES = ("domain", "private", "public")
+
+# status label -> (status, summary)
+_FIREWALL_DECISIONS = {
+    "off": ("HIGH", "Windows Firewall is turned OFF for at least one network profile."),
+    "on": ("OK", "Windows Firewall is turned ON for all network profiles."),
+    "unknown": ("WARN", "GuardDog could not verify the firewall state for every profile."),
+    "other": ("WARN", "GuardDog could not confirm that Windows Firewall is turned on for all profiles."),
+}
+
+# (domain, private, public) codes -> (status, summary). Missing profiles are ignored; any OFF
+# wins, then all-ON, then any UNKNOWN, and anything else (e.g. an unexpected netsh value) is WARN.
+_FIREWALL_STATUS = {
+    codes: _FIREWALL_DECISIONS[
+        "off" if _OFF in codes
+        else "on" if all(code in (_ON, _MISSING) for code in codes)
+        else "unknown" if _UNKNOWN in codes
+        else "other"
+    ]
+    for codes in itertools.product(range(5), repeat=3)
+}
+
+
+def _state_code(state: Union[str, bool, None]) -> int:
+    if state is None:
+        return _MISSING
+    if state is True or state == "ON":
+        return _ON
+    if state is False or state == "OFF":
+        return _OFF
+    if state.startswith("UNKNOWN"):
+        return _UNKNOWN
+    return _OTHER
+
+
+def _state_text(state: Union[str, bool, None]) -> str:
+    # FwPolicy2 reports plain booleans; everything else already uses ON/OFF/UNKNOWN text.
+    if state is None:
+        return "UNKNOWN"
+    if isinstance(state, bool):
+        return "ON" if state else "OFF"
+    return state
+
+
+def _classify_firewall_status(profile_states: Dict[str, Union[str, bool]]) -> Tuple[str, str, str]:
     if not profile_states:
         return (
             "UNKNOWN",
@@ -146,36 +292,19 @@ def _classify_firewall_status(profile_states: Dict[str, str]) -> Tuple[str, str,
             "No firewall status data was available.",
         )
 
-    any_off = any(state == "OFF" for state in profile_states.values())
-    any_unknown = any(state.startswith("UNKNOWN") for state in profile_states.values())
-    all_on = all(state == "ON" for state in profile_states.values())
-
-    detail_lines = [f"- {p.title()} profile: {profile_states.get(p, 'UNKNOWN')}" for p in ("domain", "private", "public")]
-    details = "\n".join(detail_lines)
+    states = [profile_states.get(profile) for profile in _FIREWALL_PROFILES]
+    status, summary = _FIREWALL_STATUS[tuple(_state_code(state) for state in states)]
 
-    if any_off:
-        return (
-            "HIGH",
-            "Windows Firewall is turned OFF for at least one network profile.",
-            details,
-        )
-    if all_on:
-        return (
-            "OK",
-            "Windows Firewall is turned ON for all network profiles.",
-            details,
-        )
-    if any_unknown:
-        return (
-            "WARN",
-            "GuardDog could not verify the firewall state for every profile.",
-            details,
-        )
-    return (
-        "WARN",
-        "GuardDog could not confirm that Windows Firewall is turned on for all profiles.",
-        details,
+    details = _FIREWALL_DETAILS.format(
+        domain=_state_text(states[0]),
+        private=_state_text(states[1]),
+        public=_state_text(states[2]),
     )
+    return status, summary, details
+
+
+# Constant part of every result dict (read-only so it cannot be mutated by a caller).
+_RESULT_BASE = MappingProxyType({"id": "firewall", "title": "Windows Firewall"})
 
 
 def run():
@@ -183,25 +312,44 @@ def run():
     Run the firewall check and return a standardized result dict:
         id, title, status, summary, details, remediation
     """
-    title = "Windows Firewall"
-
-    # Try netsh first (nice output when it works), then fallback to registry for widest net.
-    profile_states: Dict[str, str] = {}
+    # Registry first (no process start). Escalate to the in-process COM query, then to the shared
+    # PowerShell batch only when a profile could not be resolved, and to netsh only when
+    # PowerShell is not installed at all. A profile the registry shows as OFF already decides
+    # the status (HIGH), so the slower sources are skipped in that case.
+    profile_states = _registry_firewall_states()
     netsh_error: Optional[str] = None
 
-    try:
-        output = _run_netsh_allprofiles()
-        profile_states = _parse_netsh_allprofiles(output)
-    except Exception as exc:  # noqa: BLE001
-        netsh_error = repr(exc)
-
-    if not profile_states:
-        profile_states = _registry_firewall_states()
+    needs_escalation = not profile_states or (
+        "OFF" not in profile_states.values()
+        and any(state.startswith("UNKNOWN") for state in profile_states.values())
+    )
+    if needs_escalation:
+        escalated = _query_fw_policy2()
+        if not escalated:
+            escalated = _parse_ps_firewall_profiles(PowerShellBatch.get("firewall"))
+
+        if not escalated and not _powershell_installed():
+            try:
+                output = _run_netsh_allprofiles()
+                escalated = _parse_netsh_allprofiles(output)
+            except Exception as exc:  # noqa: BLE001
+                netsh_error = repr(exc)
+
+        # Merge rather than replace: a source that answers for only some profiles must not
+        # drop what the registry already resolved, and its own UNKNOWNs do not override it.
+        profile_states = {
+            **profile_states,
+            **{
+                profile: state
+                for profile, state in escalated.items()
+                if _state_code(state) not in (_MISSING, _UNKNOWN)
+            },
+        }
 
     status, summary, details = _classify_firewall_status(profile_states)
 
     if netsh_error:
-        details = (details + "\n\n" + f"(Note: netsh parsing failed; used registry fallback. Error: {netsh_error})").strip()
+        details = (details + "\n\n" + f"(Note: netsh parsing failed; kept registry results. Error: {netsh_error})").strip()
 
     remediation = (
         "Open the Windows Security app → 'Firewall & network protection' and make sure the firewall is ON "
@@ -211,8 +359,7 @@ def run():
         remediation = "No action needed. Windows Firewall appears to be ON for all profiles."
 
     return {
-        "id": "firewall",
-        "title": title,
+        **_RESULT_BASE,
         "status": status,
         "summary": summary,
         "details": details,
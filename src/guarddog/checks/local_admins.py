@@ -6,9 +6,11 @@ Goal:
 - Highlight "extra local admins" (local user accounts beyond the built-in Administrator).
 
 Primary method:
-- PowerShell: Get-LocalGroupMember -Group 'Administrators' | ConvertTo-Json
+- Win32 API: NetLocalGroupGetMembers (netapi32, via ctypes; no process start)
 
-Fallback method (when Get-LocalGroupMember fails):
+Fallback methods (when the API call fails):
+- WMI: Win32_GroupUser, queried in-process (needs the optional pywin32 package)
+- PowerShell: Get-LocalGroupMember -Group 'Administrators', run inside the shared PowerShell batch
 - ADSI WinNT provider: WinNT://./Administrators,group
 
 Notes:
@@ -18,12 +20,40 @@ Notes:
 
 from __future__ import annotations
 
-import json
+import functools
 import os
-import subprocess
+import re
 from dataclasses import dataclass
 from typing import List, Tuple, Optional
 
+from ._cache import ttl_cache
+from ._com import com_scope
+from ._psbatch import PowerShellBatch, run_powershell
+
+
+# Runs inside the shared PowerShell batch (see _psbatch.py) together with other checks.
+# Only the names are emitted, so the batch JSON carries plain strings rather than objects.
+PowerShellBatch.add(
+    "local_admins",
+    "Get-LocalGroupMember -Group 'Administrators' | ForEach-Object { [string]$_.Name }",
+)
+
+
+# NetLocalGroupGetMembers constants (lmcons.h / lmerr.h).
+MAX_PREFERRED_LENGTH = 0xFFFFFFFF
+NERR_SUCCESS = 0
+
+# Relative ID of the built-in Administrator account (S-1-5-21-<machine>-500), even when renamed.
+BUILTIN_ADMIN_RID = 500
+
+WMI_NAMESPACE = r"winmgmts:\\.\root\cimv2"
+# wbemFlagForwardOnly | wbemFlagReturnImmediately: stream rows without keeping them enumerable.
+WMI_QUERY_FLAGS = 0x20 | 0x10
+
+# Win32_GroupUser.PartComponent is an object path such as
+#   \\MYPC\root\cimv2:Win32_UserAccount.Domain="MYPC",Name="Alice"
+_PART_COMPONENT_RE = re.compile(r'Domain="([^"]*)",Name="([^"]*)"')
+
 
 @dataclass
 class LocalAdminsState:
@@ -35,123 +65,260 @@ class LocalAdminsState:
     error: str | None = None
 
 
-def _find_powershell_exe() -> str:
+def _names_from_data(data) -> list[str] | None:
+    """
+    The batch result is a single name (one member) or a list of names.
+    """
+    if isinstance(data, str):
+        items = [data]
+    elif isinstance(data, list):
+        items = data
+    else:
+        return None
+
+    names = [item.strip() for item in items if isinstance(item, str) and item.strip()]
+    return names or None
+
+
+def _parse_names_from_text(text: str) -> list[str] | None:
+    """Parse one name per line (plain PowerShell text output)."""
+    names = [line.strip() for line in text.splitlines() if line.strip()]
+    return names or None
+
+
+# ADSI WinNT fallback script; used only when the API, WMI and Get-LocalGroupMember all fail.
+# Prints one name per line (plain text, no JSON serialization).
+_ADSI_SCRIPT = r"""
+$group = [ADSI]"WinNT://./Administrators,group"
+$members = @($group.psbase.Invoke("Members"))
+foreach ($m in $members) {
+  [string]$m.GetType().InvokeMember("Name",'GetProperty',$null,$m,$null)
+}
+""".strip()
+
+
+@functools.cache
+def _netapi32():
     """
-    Prefer Windows PowerShell if present at the well-known path.
-    Fallback to just 'powershell' (let PATH resolve it).
+    Load netapi32 with the member-list signatures set.
+
+    Returns (netapi32, LOCALGROUP_MEMBERS_INFO_3 structure type), or None when not on Windows.
     """
-    windir = os.environ.get("WINDIR", r"C:\Windows")
-    candidate = os.path.join(windir, "System32", "WindowsPowerShell", "v1.0", "powershell.exe")
-    if os.path.isfile(candidate):
-        return candidate
-    return "powershell"
+    try:
+        import ctypes
+        from ctypes import wintypes
 
+        netapi32 = ctypes.WinDLL("netapi32")  # type: ignore[attr-defined]
+    except (ImportError, AttributeError, OSError):
+        return None
 
-def _run_powershell_json(script: str, timeout_seconds: int = 8) -> str | None:
+    class LOCALGROUP_MEMBERS_INFO_3(ctypes.Structure):
+        _fields_ = [("lgrmi3_domainandname", wintypes.LPWSTR)]
+
+    netapi32.NetLocalGroupGetMembers.argtypes = [
+        wintypes.LPCWSTR,  # servername (None: local machine)
+        wintypes.LPCWSTR,  # localgroupname
+        wintypes.DWORD,  # level
+        ctypes.POINTER(ctypes.POINTER(LOCALGROUP_MEMBERS_INFO_3)),  # bufptr
+        wintypes.DWORD,  # prefmaxlen
+        wintypes.LPDWORD,  # entriesread
+        wintypes.LPDWORD,  # totalentries
+        ctypes.POINTER(ctypes.c_size_t),  # resumehandle (PDWORD_PTR)
+    ]
+    netapi32.NetLocalGroupGetMembers.restype = wintypes.DWORD
+    netapi32.NetApiBufferFree.argtypes = [ctypes.c_void_p]
+    netapi32.NetApiBufferFree.restype = wintypes.DWORD
+    return netapi32, LOCALGROUP_MEMBERS_INFO_3
+
+
+def _netapi_local_admins() -> list[str] | None:
     """
-    Run a PowerShell script and return stdout (expected JSON), or None on failure.
-    Forces UTF-8 output encoding to match Python decoding.
+    List Administrators members with netapi32!NetLocalGroupGetMembers (level 3: DOMAIN\\name).
+
+    Returns None when not on Windows or when the call fails.
     """
-    ps_exe = _find_powershell_exe()
+    loaded = _netapi32()
+    if loaded is None:
+        return None
+    netapi32, LOCALGROUP_MEMBERS_INFO_3 = loaded
 
-    wrapped = (
-        "$ErrorActionPreference = 'Stop'; "
-        "[Console]::OutputEncoding = [System.Text.Encoding]::UTF8; "
-        + script
-    )
+    import ctypes
+    from ctypes import wintypes
+
+    buf = ctypes.POINTER(LOCALGROUP_MEMBERS_INFO_3)()
+    entries_read = wintypes.DWORD()
+    total_entries = wintypes.DWORD()
 
-    cmd = [ps_exe, "-NoLogo", "-NoProfile", "-NonInteractive", "-Command", wrapped]
     try:
-        proc = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            timeout=timeout_seconds,
-            stdin=subprocess.DEVNULL,
-            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        rc = netapi32.NetLocalGroupGetMembers(
+            None,
+            "Administrators",
+            3,
+            ctypes.byref(buf),
+            MAX_PREFERRED_LENGTH,
+            ctypes.byref(entries_read),
+            ctypes.byref(total_entries),
+            None,
         )
-    except Exception:
-        return None
+        if rc != NERR_SUCCESS or not buf:
+            return None
 
-    if proc.returncode != 0:
-        return None
+        names = [buf[i].lgrmi3_domainandname for i in range(entries_read.value)]
+    finally:
+        if buf:
+            netapi32.NetApiBufferFree(buf)
+
+    return [name.strip() for name in names if name and name.strip()] or None
 
-    out = proc.stdout.strip()
-    return out if out else None
+
+def _names_from_part_components(paths) -> list[str] | None:
+    """Turn Win32_GroupUser PartComponent object paths into DOMAIN\\name strings."""
+    names: list[str] = []
+    for path in paths:
+        match = _PART_COMPONENT_RE.search(str(path))
+        if match:
+            names.append(f"{match.group(1)}\\{match.group(2)}")
+    return names or None
 
 
-def _parse_names_from_json(stdout: str) -> list[str] | None:
+def _query_wmi_local_admins() -> list[str] | None:
     """
-    ConvertTo-Json can return:
-    - a dict (single object)
-    - a list of dicts
-    We extract item['Name'] for each.
+    List Administrators members over WMI in-process (Win32_GroupUser, PartComponent only).
+
+    Returns None when pywin32 is not installed, COMPUTERNAME is unset, or the query fails.
     """
-    try:
-        data = json.loads(stdout)
-    except json.JSONDecodeError:
+    computer_name = os.environ.get("COMPUTERNAME", "").strip()
+    if not computer_name:
         return None
 
-    items: list[dict]
-    if isinstance(data, dict):
-        items = [data]
-    elif isinstance(data, list):
-        items = [x for x in data if isinstance(x, dict)]
-    else:
-        return None
+    query = (
+        "SELECT PartComponent FROM Win32_GroupUser WHERE GroupComponent="
+        f"\"Win32_Group.Domain='{computer_name}',Name='Administrators'\""
+    )
 
-    names: list[str] = []
-    for item in items:
-        name = item.get("Name")
-        if isinstance(name, str) and name.strip():
-            names.append(name.strip())
+    # COM is normally already initialized for this worker thread by checks.run_all.
+    with com_scope() as com_ready:
+        if not com_ready:
+            return None
+        try:
+            import win32com.client  # type: ignore[import-not-found]
 
-    return names or None
+            service = win32com.client.GetObject(WMI_NAMESPACE)
+            rows = service.ExecQuery(query, "WQL", WMI_QUERY_FLAGS)
+            return _names_from_part_components(row.PartComponent for row in rows)
+        except Exception:  # noqa: BLE001
+            return None
 
 
 def _query_local_admins() -> Tuple[list[str] | None, str, str | None]:
     """
-    Try PowerShell Get-LocalGroupMember first.
-    If that fails, try ADSI WinNT provider.
+    Try the NetLocalGroupGetMembers API first, then WMI (both in-process).
+    If those fail, try PowerShell Get-LocalGroupMember (shared batch),
+    then the ADSI WinNT provider (separate PowerShell run, only when needed).
     Returns: (names_or_none, data_source, error_or_none)
     """
-    # 1) Try Get-LocalGroupMember (preferred)
-    ps_script_primary = r"""
-    Get-LocalGroupMember -Group 'Administrators' |
-      Select-Object -Property Name,ObjectClass |
-      ConvertTo-Json -Compress
-    """.strip()
-
-    out = _run_powershell_json(ps_script_primary)
-    if out:
-        names = _parse_names_from_json(out)
-        if names:
-            return (names, "powershell", None)
-
-    # 2) Fallback: ADSI WinNT provider (often works when LocalAccounts module doesn't)
-    ps_script_fallback = r"""
-    $group = [ADSI]"WinNT://./Administrators,group"
-    $members = @($group.psbase.Invoke("Members"))
-    $out = @()
-    foreach ($m in $members) {
-      $name  = $m.GetType().InvokeMember("Name",'GetProperty',$null,$m,$null)
-      $class = $m.GetType().InvokeMember("Class",'GetProperty',$null,$m,$null)
-      $out += [PSCustomObject]@{ Name = [string]$name; ObjectClass = [string]$class }
-    }
-    $out | ConvertTo-Json -Compress
-    """.strip()
-
-    out2 = _run_powershell_json(ps_script_fallback)
+    # 1) Win32 API (preferred): no PowerShell start, no JSON round trip
+    names = _netapi_local_admins()
+    if names:
+        return (names, "netapi", None)
+
+    # 2) WMI Win32_GroupUser: still no PowerShell start
+    names = _query_wmi_local_admins()
+    if names:
+        return (names, "wmi", None)
+
+    # 3) Get-LocalGroupMember, from the shared PowerShell batch
+    names = _names_from_data(PowerShellBatch.get("local_admins"))
+    if names:
+        return (names, "powershell", None)
+
+    # 4) Fallback: ADSI WinNT provider (often works when LocalAccounts module doesn't).
+    # Sent to the resident PowerShell host that already ran the batch, so no second process start.
+    out2 = run_powershell(_ADSI_SCRIPT)
     if out2:
-        names2 = _parse_names_from_json(out2)
+        names2 = _parse_names_from_text(out2)
         if names2:
             return (names2, "adsi", None)
 
     return (None, "none", "PowerShell query failed or returned no usable data.")
 
 
+@functools.cache
+def _advapi32():
+    """Load advapi32 with the account/SID helper signatures set; None when not on Windows."""
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        advapi32 = ctypes.WinDLL("advapi32")  # type: ignore[attr-defined]
+    except (ImportError, AttributeError, OSError):
+        return None
+
+    advapi32.LookupAccountNameW.argtypes = [
+        wintypes.LPCWSTR,  # lpSystemName (None: local machine)
+        wintypes.LPCWSTR,  # lpAccountName
+        ctypes.c_void_p,  # Sid (PSID)
+        wintypes.LPDWORD,  # cbSid
+        wintypes.LPWSTR,  # ReferencedDomainName
+        wintypes.LPDWORD,  # cchReferencedDomainName
+        wintypes.LPDWORD,  # peUse (PSID_NAME_USE)
+    ]
+    advapi32.LookupAccountNameW.restype = wintypes.BOOL
+    advapi32.GetSidSubAuthorityCount.argtypes = [ctypes.c_void_p]
+    advapi32.GetSidSubAuthorityCount.restype = ctypes.POINTER(ctypes.c_ubyte)
+    advapi32.GetSidSubAuthority.argtypes = [ctypes.c_void_p, wintypes.DWORD]
+    advapi32.GetSidSubAuthority.restype = ctypes.POINTER(wintypes.DWORD)
+    return advapi32
+
+
+# Account name -> RID, for successful lookups only (a failed lookup is retried next time).
+_account_rids: dict[str, int] = {}
+
+
+def _account_rid(name: str) -> int | None:
+    """
+    Return the last sub-authority (RID) of an account's SID via LookupAccountNameW.
+
+    None when not on Windows or the account cannot be resolved. Resolved RIDs are cached per name.
+    """
+    rid = _account_rids.get(name)
+    if rid is not None:
+        return rid
+
+    advapi32 = _advapi32()
+    if advapi32 is None:
+        return None
+
+    import ctypes
+    from ctypes import wintypes
+
+    sid_size = wintypes.DWORD(0)
+    domain_size = wintypes.DWORD(0)
+    sid_use = wintypes.DWORD(0)
+
+    # First call only reports the buffer sizes.
+    advapi32.LookupAccountNameW(
+        None, name, None, ctypes.byref(sid_size), None, ctypes.byref(domain_size), ctypes.byref(sid_use)
+    )
+    if not sid_size.value:
+        return None
+
+    sid = ctypes.create_string_buffer(sid_size.value)
+    domain = ctypes.create_unicode_buffer(domain_size.value)
+    if not advapi32.LookupAccountNameW(
+        None, name, sid, ctypes.byref(sid_size), domain, ctypes.byref(domain_size), ctypes.byref(sid_use)
+    ):
+        return None
+
+    count = advapi32.GetSidSubAuthorityCount(sid)[0]
+    if not count:
+        return None
+    rid = int(advapi32.GetSidSubAuthority(sid, count - 1)[0])
+    _account_rids[name] = rid
+    return rid
+
+
+@ttl_cache()
 def _get_local_admins_state() -> LocalAdminsState:
     names, source, err = _query_local_admins()
     members = names or []
@@ -161,15 +328,19 @@ def _get_local_admins_state() -> LocalAdminsState:
     extra_local_admins: list[str] = []
 
     if computer_name and members:
-        prefix = (computer_name + "\\").upper()
+        # Fold each name once; casefold() is the Unicode-correct caseless comparison.
+        prefix = (computer_name + "\\").casefold()
+        builtin_admin = f"{computer_name}\\Administrator".casefold()
         for name in members:
-            if name.upper().startswith(prefix):
+            folded = name.casefold()
+            if folded.startswith(prefix):
                 local_admins.append(name)
-
-        builtin_admin_upper = f"{computer_name}\\Administrator".upper()
-        for name in local_admins:
-            if name.upper() != builtin_admin_upper:
-                extra_local_admins.append(name)
+                # The SID identifies the built-in account even when it was renamed;
+                # compare names only when the SID cannot be looked up.
+                rid = _account_rid(name)
+                is_builtin = rid == BUILTIN_ADMIN_RID if rid is not None else folded == builtin_admin
+                if not is_builtin:
+                    extra_local_admins.append(name)
 
     return LocalAdminsState(
         members=members,
@@ -190,40 +361,31 @@ def _classify_local_admins_state(state: LocalAdminsState) -> Tuple[str, str, str
             + (f"Error: {state.error}" if state.error else ""),
         )
 
-    detail_lines: list[str] = []
-    detail_lines.append("The following accounts have administrator rights on this computer:")
-
-    # Mark local accounts
-    extras_upper = {x.upper() for x in state.extra_local_admins}
-    locals_upper = {x.upper() for x in state.local_admins}
-
-    for name in state.members:
-        name_u = name.upper()
-        if name_u in extras_upper:
-            marker = " (local user account)"
-        elif name_u in locals_upper:
-            marker = " (built-in local account)"
-        else:
-            marker = ""
-        detail_lines.append(f"- {name}{marker}")
-
-    detail_lines.append("")
-    detail_lines.append(f"Data source: {state.data_source}")
+    # Decide first; the details below do not affect the outcome.
+    if state.extra_local_admins:
+        status, summary = "WARN", "One or more local user accounts have administrator rights on this computer."
+    else:
+        status, summary = "OK", "Only built-in or domain accounts were found in the local Administrators group."
 
-    details = "\n".join(detail_lines)
+    # Mark local accounts (extra local admins win over the built-in marker). With no local
+    # accounts in the group there is nothing to mark, so names are not folded at all.
+    markers = {x.casefold(): " (built-in local account)" for x in state.local_admins}
+    markers.update((x.casefold(), " (local user account)") for x in state.extra_local_admins)
 
-    if state.extra_local_admins:
-        return (
-            "WARN",
-            "One or more local user accounts have administrator rights on this computer.",
-            details,
+    if markers:
+        member_lines = [f"- {name}{markers.get(name.casefold(), '')}" for name in state.members]
+    else:
+        member_lines = [f"- {name}" for name in state.members]
+
+    details = "\n".join(
+        (
+            "The following accounts have administrator rights on this computer:",
+            *member_lines,
+            "",
+            f"Data source: {state.data_source}",
         )
-
-    return (
-        "OK",
-            "Only built-in or domain accounts were found in the local Administrators group.",
-        details,
     )
+    return status, summary, details
 
 
 def run():
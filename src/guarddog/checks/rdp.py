@@ -28,17 +28,20 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Tuple
 
-try:
-    import winreg  # type: ignore[attr-defined]
-except ImportError:  # pragma: no cover
-    winreg = None  # type: ignore[assignment]
+from ._cache import ttl_cache
+from ._registry import hklm, read_dwords, winreg_available
 
 
 RDP_KEY_PATH = r"SYSTEM\CurrentControlSet\Control\Terminal Server"
 RDP_TCP_KEY_PATH = r"SYSTEM\CurrentControlSet\Control\Terminal Server\WinStations\RDP-Tcp"
 
+# Values read from each subkey; every subkey is opened once and all of its values are
+# read through that one handle (add names here rather than issuing separate reads).
+RDP_VALUE_NAMES = ("fDenyTSConnections",)
+RDP_TCP_VALUE_NAMES = ("UserAuthentication", "SecurityLayer")
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class RdpState:
     rdp_enabled: bool | None
     nla_required: bool | None
@@ -48,21 +51,9 @@ class RdpState:
     error: str | None = None
 
 
-def _read_registry_dword(root, subkey: str, value_name: str) -> int | None:
-    if winreg is None:
-        return None
-    try:
-        with winreg.OpenKey(root, subkey, 0, winreg.KEY_READ) as key:
-            value, reg_type = winreg.QueryValueEx(key, value_name)
-            if reg_type != winreg.REG_DWORD:
-                return None
-            return int(value)
-    except OSError:
-        return None
-
-
+@ttl_cache()
 def _get_rdp_state() -> RdpState:
-    if winreg is None:
+    if not winreg_available():
         return RdpState(
             rdp_enabled=None,
             nla_required=None,
@@ -71,21 +62,24 @@ def _get_rdp_state() -> RdpState:
             error="winreg unavailable (not running on Windows Python).",
         )
 
-    root = winreg.HKEY_LOCAL_MACHINE
+    # Each subkey is opened once (cached handle) and all of its values come from that handle.
+    root = hklm()
+    rdp_values = read_dwords(root, RDP_KEY_PATH, RDP_VALUE_NAMES)
+    tcp_values = read_dwords(root, RDP_TCP_KEY_PATH, RDP_TCP_VALUE_NAMES)
 
-    deny = _read_registry_dword(root, RDP_KEY_PATH, "fDenyTSConnections")
+    deny = rdp_values["fDenyTSConnections"]
     if deny is None:
         rdp_enabled = None
     else:
         rdp_enabled = (deny == 0)
 
-    user_auth = _read_registry_dword(root, RDP_TCP_KEY_PATH, "UserAuthentication")
+    user_auth = tcp_values["UserAuthentication"]
     if user_auth is None:
         nla_required = None
     else:
         nla_required = (user_auth == 1)
 
-    security_layer = _read_registry_dword(root, RDP_TCP_KEY_PATH, "SecurityLayer")
+    security_layer = tcp_values["SecurityLayer"]
 
     return RdpState(
         rdp_enabled=rdp_enabled,
@@ -96,42 +90,41 @@ def _get_rdp_state() -> RdpState:
     )
 
 
-def _security_layer_text(v: int | None) -> str:
-    if v is None:
-        return "UNKNOWN"
-    if v == 0:
-        return "RDP (0)"
-    if v == 1:
-        return "Negotiate (1)"
-    if v == 2:
-        return "TLS/SSL (2)"
-    return f"UNKNOWN({v})"
-
+_SECURITY_LAYER_TEXT = {None: "UNKNOWN", 0: "RDP (0)", 1: "Negotiate (1)", 2: "TLS/SSL (2)"}
 
-def _classify_rdp_state(state: RdpState) -> Tuple[str, str, str]:
-    detail_lines: list[str] = []
-    detail_lines.append(f"Data source: {state.data_source}")
 
-    if state.rdp_enabled is True:
-        detail_lines.append("- Remote Desktop connections: ENABLED")
-    elif state.rdp_enabled is False:
-        detail_lines.append("- Remote Desktop connections: DISABLED")
-    else:
-        detail_lines.append("- Remote Desktop connections: UNKNOWN")
-
-    if state.nla_required is True:
-        detail_lines.append("- Network Level Authentication (NLA): REQUIRED")
-    elif state.nla_required is False:
-        detail_lines.append("- Network Level Authentication (NLA): NOT required")
-    else:
-        detail_lines.append("- Network Level Authentication (NLA): UNKNOWN")
-
-    detail_lines.append(f"- Security layer (supporting): {_security_layer_text(state.security_layer)}")
+def _security_layer_text(v: int | None) -> str:
+    text = _SECURITY_LAYER_TEXT.get(v)
+    return text if text is not None else f"UNKNOWN({v})"
+
+
+# Detail lines, built once and reused by every call (keyed by the tri-state setting).
+_RDP_LINES = {
+    True: "- Remote Desktop connections: ENABLED",
+    False: "- Remote Desktop connections: DISABLED",
+    None: "- Remote Desktop connections: UNKNOWN",
+}
+_NLA_LINES = {
+    True: "- Network Level Authentication (NLA): REQUIRED",
+    False: "- Network Level Authentication (NLA): NOT required",
+    None: "- Network Level Authentication (NLA): UNKNOWN",
+}
+_SECURITY_LAYER_LINES = {
+    v: f"- Security layer (supporting): {text}" for v, text in _SECURITY_LAYER_TEXT.items()
+}
 
-    if state.error:
-        detail_lines.append(f"Error: {state.error}")
 
-    details = "\n".join(detail_lines)
+def _classify_rdp_state(state: RdpState) -> Tuple[str, str, str]:
+    details = "\n".join(
+        (
+            f"Data source: {state.data_source}",
+            _RDP_LINES[state.rdp_enabled],
+            _NLA_LINES[state.nla_required],
+            _SECURITY_LAYER_LINES.get(state.security_layer)
+            or f"- Security layer (supporting): {_security_layer_text(state.security_layer)}",
+            *((f"Error: {state.error}",) if state.error else ()),
+        )
+    )
 
     # Classification logic (keep simple and user-facing)
     if state.rdp_enabled is False:
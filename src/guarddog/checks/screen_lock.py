@@ -32,10 +32,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Tuple
 
-try:
-    import winreg  # type: ignore[attr-defined]
-except ImportError:  # pragma: no cover - should exist on Windows
-    winreg = None  # type: ignore[assignment]
+from ._registry import HKEY_CURRENT_USER, read_strings
 
 
 DESKTOP_KEY_PATH = r"Control Panel\Desktop"
@@ -45,7 +42,7 @@ OK_TIMEOUT_SECONDS = 15 * 60       # 15 minutes
 WARN_TIMEOUT_SECONDS = 30 * 60     # 30 minutes
 
 
-@dataclass
+@dataclass(slots=True)
 class ScreenLockState:
     """Container for screen lock related settings."""
 
@@ -54,60 +51,69 @@ class ScreenLockState:
     timeout_seconds: int | None # Parsed ScreenSaveTimeOut, or None
 
 
-def _read_hkcu_desktop_value(value_name: str) -> str | None:
+DESKTOP_VALUE_NAMES = ("ScreenSaveActive", "ScreenSaverIsSecure", "ScreenSaveTimeOut")
+
+
+def _read_hkcu_desktop_values() -> dict[str, str | None]:
     """
-    Helper: read a string value from HKCU\\Control Panel\\Desktop.
+    Helper: read the screen saver string values from HKCU\\Control Panel\\Desktop.
+
+    The key is opened once (cached handle) and all values are read through it.
 
     Returns:
-        value string, or None if missing or on error.
+        value name -> string, or None if missing or on error.
     """
-    if winreg is None:
+    return read_strings(HKEY_CURRENT_USER, DESKTOP_KEY_PATH, DESKTOP_VALUE_NAMES)
+
+
+# Registry flag strings -> bool (the reader already strips values). Anything other
+# than "1" means the feature is off, as before.
+_BOOL_MAP = {"1": True, "0": False}
+
+
+def _to_bool(v: str | None) -> bool | None:
+    if v is None:
         return None
+    return _BOOL_MAP.get(v, False)
+
 
+def _to_timeout(v: str | None) -> int | None:
+    """Parse ScreenSaveTimeOut seconds; None if missing, invalid, or not positive."""
+    if v is None:
+        return None
     try:
-        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, DESKTOP_KEY_PATH, 0, winreg.KEY_READ) as key:
-            value, reg_type = winreg.QueryValueEx(key, value_name)
-            # These values are typically REG_SZ
-            if reg_type not in (winreg.REG_SZ, winreg.REG_EXPAND_SZ):
-                return None
-            if isinstance(value, str):
-                return value.strip()
-            return str(value).strip()
-    except OSError:
+        seconds = int(v)
+    except ValueError:
         return None
+    return seconds if seconds > 0 else None
 
 
 def _get_screen_lock_state() -> ScreenLockState:
     """
     Read the relevant HKCU desktop values and return a ScreenLockState.
     """
-    active_raw = _read_hkcu_desktop_value("ScreenSaveActive")
-    secure_raw = _read_hkcu_desktop_value("ScreenSaverIsSecure")
-    timeout_raw = _read_hkcu_desktop_value("ScreenSaveTimeOut")
-
-    def to_bool_flag(v: str | None) -> bool | None:
-        if v is None:
-            return None
-        return v.strip() == "1"
-
-    def to_int_seconds(v: str | None) -> int | None:
-        if v is None:
-            return None
-        try:
-            seconds = int(v.strip())
-            if seconds <= 0:
-                return None
-            return seconds
-        except ValueError:
-            return None
-
+    values = _read_hkcu_desktop_values()
     return ScreenLockState(
-        active=to_bool_flag(active_raw),
-        secure=to_bool_flag(secure_raw),
-        timeout_seconds=to_int_seconds(timeout_raw),
+        active=_to_bool(values["ScreenSaveActive"]),
+        secure=_to_bool(values["ScreenSaverIsSecure"]),
+        timeout_seconds=_to_timeout(values["ScreenSaveTimeOut"]),
     )
 
 
+# Detail lines, built once and reused by every call (keyed by the tri-state setting).
+_ACTIVE_LINES = {
+    True: "- Automatic screen lock: ENABLED (screen saver active).",
+    False: "- Automatic screen lock: DISABLED (no screen saver).",
+    None: "- Automatic screen lock: UNKNOWN (setting not found).",
+}
+_SECURE_LINES = {
+    True: "- Require password on resume: ENABLED.",
+    False: "- Require password on resume: DISABLED.",
+    None: "- Require password on resume: UNKNOWN.",
+}
+_TIMEOUT_UNKNOWN_LINE = "- Idle timeout before lock: UNKNOWN (could not read a valid timeout)."
+
+
 def _classify_screen_lock_state(state: ScreenLockState) -> Tuple[str, str, str]:
     """
     Given a ScreenLockState, decide the check status, summary, and details.
@@ -116,28 +122,15 @@ def _classify_screen_lock_state(state: ScreenLockState) -> Tuple[str, str, str]:
         (status, summary, details)
     """
     # Build human-readable details
-    detail_lines = []
-
-    if state.active is True:
-        detail_lines.append("- Automatic screen lock: ENABLED (screen saver active).")
-    elif state.active is False:
-        detail_lines.append("- Automatic screen lock: DISABLED (no screen saver).")
-    else:
-        detail_lines.append("- Automatic screen lock: UNKNOWN (setting not found).")
-
-    if state.secure is True:
-        detail_lines.append("- Require password on resume: ENABLED.")
-    elif state.secure is False:
-        detail_lines.append("- Require password on resume: DISABLED.")
-    else:
-        detail_lines.append("- Require password on resume: UNKNOWN.")
-
-    if state.timeout_seconds is not None:
-        detail_lines.append(f"- Idle timeout before lock: approximately {state.timeout_seconds} seconds.")
-    else:
-        detail_lines.append("- Idle timeout before lock: UNKNOWN (could not read a valid timeout).")
-
-    details = "\n".join(detail_lines)
+    details = "\n".join(
+        (
+            _ACTIVE_LINES[state.active],
+            _SECURE_LINES[state.secure],
+            f"- Idle timeout before lock: approximately {state.timeout_seconds} seconds."
+            if state.timeout_seconds is not None
+            else _TIMEOUT_UNKNOWN_LINE,
+        )
+    )
 
     # Classification logic
     if state.active is False:
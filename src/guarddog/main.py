@@ -9,13 +9,21 @@ Phase 1 goal:
 
 from __future__ import annotations
 
+import argparse
+import math
+import os
 import sys
-import webbrowser
+import time
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence
 
-from .checks import firewall, rdp, defender, local_admins, screen_lock
-from .reporting.html_report import build_report_html, default_report_path
+from .checks import ALL_CHECKS, clear_caches, run_all
+from .checks._psbatch import DEFAULT_TIMEOUT_SECONDS, set_powershell_timeout
+from .reporting.html_report import default_report_path, iter_report_html_chunks
+
+
+# Report order.
+CHECKS = ALL_CHECKS
 
 
 def _detect_base_dir() -> Path:
@@ -37,56 +45,78 @@ def _detect_base_dir() -> Path:
 
 def _run_all_checks() -> List[Dict[str, Any]]:
     """
-    Run all configured checks and collect their results in a list.
+    Run all configured checks and collect their results in a list (in CHECKS order).
 
-    Each check module exposes a `run()` function returning a dict with:
-        id, title, status, summary, details, remediation
+    See checks.run_all: checks run concurrently on a thread pool.
     """
-    results: List[Dict[str, Any]] = []
-
-    # As we implement real checks, this is where we can handle exceptions per-check
-    # to avoid one failure killing the entire run.
-    for check in (firewall, rdp, defender, local_admins, screen_lock):
-        try:
-            result = check.run()
-        except Exception as exc:  # noqa: BLE001
-            # In an MVP, we keep error handling simple: mark the check as failed to run.
-            result = {
-                "id": getattr(check, "__name__", "unknown_check"),
-                "title": getattr(check, "__doc__", "Unknown check").strip().splitlines()[0]
-                if getattr(check, "__doc__", None)
-                else "Unknown check",
-                "status": "UNKNOWN",
-                "summary": "This check failed to run due to an internal error.",
-                "details": f"Error: {exc!r}",
-                "remediation": "You can ignore this for now or try a newer version of GuardDog later.",
-            }
-        results.append(result)
-
-    return results
-
-
-def main() -> int:
+    return run_all(CHECKS)
+
+
+def _positive_seconds(text: str) -> float:
+    """argparse type for --ps-timeout: a finite number of seconds greater than 0."""
+    try:
+        seconds = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number of seconds: {text!r}") from None
+    if not (math.isfinite(seconds) and seconds > 0):
+        raise argparse.ArgumentTypeError(f"must be greater than 0: {text!r}")
+    return seconds
+
+
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="guarddog",
+        description="Run basic, read-only Windows security checks and write an HTML report.",
+    )
+    parser.add_argument(
+        "--ps-timeout",
+        type=_positive_seconds,
+        default=DEFAULT_TIMEOUT_SECONDS,
+        metavar="SECONDS",
+        help=(
+            "How long to wait for a PowerShell query before giving up and using other sources "
+            f"(default: {DEFAULT_TIMEOUT_SECONDS:g})."
+        ),
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
     """
     Entry point for GuardDog.
 
+    argv: command-line arguments without the program name. None means no arguments
+    (so embedding GuardDog or calling main() from tests never reads sys.argv).
+
     Returns a process exit code:
         0 on success (report written),
         non-zero on unexpected/unrecoverable errors.
     """
+    args = _parse_args([] if argv is None else argv)
+    set_powershell_timeout(args.ps_timeout)
+
+    # OS query results are cached per process (see checks.clear_caches); allow opting out.
+    if os.environ.get("GUARDDOG_NOCACHE") == "1":
+        clear_caches()
+
     base_dir = _detect_base_dir()
 
     # Run checks (placeholders for now).
     check_results = _run_all_checks()
 
-    # Build HTML report from results.
-    html = build_report_html(check_results)
+    # Read the clock once so the file name and the "Generated at" line always agree.
+    now = time.localtime()
 
     # Decide where to write the report (e.g. <base_dir>/reports/GuardDog_Report_YYYYMMDD_HHMMSS.html).
-    report_path = default_report_path(base_dir)
+    report_path = default_report_path(base_dir, time.strftime("%Y%m%d_%H%M%S", now))
+    generated_at = time.strftime("%Y-%m-%d %H:%M:%S", now)
 
+    # Stream the HTML report to disk chunk by chunk (no full in-memory copy of the document).
+    # Each chunk is encoded once and written in binary mode, skipping the text-mode codec layer.
     try:
-        report_path.write_text(html, encoding="utf-8")
+        with open(report_path, "wb") as f:
+            for chunk in iter_report_html_chunks(check_results, generated_at):
+                f.write(chunk.encode("utf-8"))
     except OSError as exc:
         # If we can't write the report, this is a hard failure.
         print(f"[GuardDog] Failed to write report to {report_path}: {exc}", file=sys.stderr)
@@ -95,7 +125,10 @@ def main() -> int:
     print(f"[GuardDog] Report written to: {report_path}")
 
     # Best-effort: try to open the report in the default browser.
+    # webbrowser is imported here, not at module top: it pulls in shlex/subprocess/shutil.
     try:
+        import webbrowser
+
         webbrowser.open(report_path.as_uri())
     except Exception:
         # Non-fatal; user can always open the HTML manually.
@@ -4,14 +4,25 @@ Functions to build a self-contained HTML report from check results.
 
 from __future__ import annotations
 
-from datetime import datetime
+import time
 from pathlib import Path
-from typing import Iterable, Mapping, Any, Tuple
+from typing import Iterable, Iterator, Mapping, Any, Tuple
 import html
 
 
 def _esc(value: Any) -> str:
-    return html.escape("" if value is None else str(value), quote=True)
+    text = "" if value is None else str(value)
+    # Most report text has nothing to escape; five substring scans are cheaper than
+    # html.escape's chain of replace() calls, each of which copies the string.
+    if "&" in text or "<" in text or ">" in text or '"' in text or "'" in text:
+        return html.escape(text, quote=True)
+    return text
+
+
+# One bit per status for classify_overall_status; anything unrecognized counts as UNKNOWN.
+# Statuses arrive upper-case (checks.run_all normalizes them), so they are looked up as-is.
+_HIGH_BIT, _WARN_BIT, _OK_BIT, _UNKNOWN_BIT = 8, 4, 2, 1
+_STATUS_BITS = {"HIGH": _HIGH_BIT, "WARN": _WARN_BIT, "OK": _OK_BIT}
 
 
 def classify_overall_status(check_results: Iterable[Mapping[str, Any]]) -> Tuple[str, str]:
@@ -27,43 +38,27 @@ def classify_overall_status(check_results: Iterable[Mapping[str, Any]]) -> Tuple
         - UNKNOWN means we couldn't verify something important (restricted env, parsing issues).
         - OK only when everything relevant is verified OK (or there are no checks).
     """
-    has_high = False
-    has_warn = False
-    has_unknown = False
-    has_ok = False
-
+    # OR together one bit per status seen; HIGH outranks everything, so stop at the first one.
+    mask = 0
     for result in check_results:
-        status = str(result.get("status", "UNKNOWN")).upper()
-        if status == "HIGH":
-            has_high = True
-        elif status == "WARN":
-            has_warn = True
-        elif status == "OK":
-            has_ok = True
-        else:
-            has_unknown = True
-
-    if has_high:
+        bit = _STATUS_BITS.get(result.get("status"), _UNKNOWN_BIT)
+        mask |= bit
+        if bit == _HIGH_BIT:
+            break
+
+    if mask & _HIGH_BIT:
         return ("HIGH", "GuardDog found some important security issues that you should fix soon.")
-    if has_warn:
+    if mask & _WARN_BIT:
         return ("WARN", "GuardDog found some things that could be improved to make this computer safer.")
-    if has_unknown:
+    if mask & _UNKNOWN_BIT:
         return ("UNKNOWN", "GuardDog could not verify everything. Some checks were blocked or unclear.")
-    if has_ok:
+    if mask & _OK_BIT:
         return ("OK", "GuardDog did not find any obvious high-risk issues in the checks it ran.")
     return ("UNKNOWN", "GuardDog did not run any checks.")
 
 
-def build_report_html(check_results: Iterable[Mapping[str, Any]]) -> str:
-    """
-    Build a complete HTML document as a string from the given check results.
-    This HTML is self-contained (inline CSS, no external scripts or styles).
-    """
-    check_results = list(check_results)
-    overall_status, overall_message = classify_overall_status(check_results)
-    generated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    css = """
+# Inline stylesheet and the static start/end of the document, built once at import.
+_CSS = """
         body { font-family: system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
                margin: 2rem; background: #fdfdfd; color: #222; }
         h1 { margin-bottom: 0.25rem; }
@@ -97,57 +92,119 @@ def build_report_html(check_results: Iterable[Mapping[str, Any]]) -> str:
         }
     """
 
-    html_lines = [
-        "<!DOCTYPE html>",
-        "<html lang='en'>",
-        "<head>",
-        "  <meta charset='utf-8'>",
-        "  <title>GuardDog Security Check Report</title>",
-        f"  <style>{css}</style>",
-        "</head>",
-        "<body>",
-        "  <h1>GuardDog Security Check Report</h1>",
-        f"  <div class='meta'>Generated at {_esc(generated_at)}</div>",
-        f"  <div class='summary summary-{_esc(overall_status)}'>",
-        f"    <p>{_esc(overall_message)}</p>",
-        "  </div>",
-        "  <div class='checks'>",
-    ]
+_DOC_HEAD = (
+    "<!DOCTYPE html>\n"
+    "<html lang='en'>\n"
+    "<head>\n"
+    "  <meta charset='utf-8'>\n"
+    "  <title>GuardDog Security Check Report</title>\n"
+    f"  <style>{_CSS}</style>\n"
+    "</head>\n"
+    "<body>\n"
+    "  <h1>GuardDog Security Check Report</h1>\n"
+)
+
+_DOC_TAIL = "\n  </div>\n</body>\n</html>"
+
+
+# Status badge markup for the closed set of statuses (already escaped); anything else is shown as UNKNOWN.
+_STATUS_BADGES = {
+    status: f"\n      <div class='check-status status-badge-{status}'>Status: {status}</div>"
+    for status in ("OK", "WARN", "HIGH", "UNKNOWN")
+}
+
+
+def _status_badge(status: Any) -> str:
+    return _STATUS_BADGES.get(status) or _STATUS_BADGES["UNKNOWN"]
+
+
+# One template per check section; the optional blocks are "" or pre-escaped HTML.
+_SECTION_TMPL = (
+    "\n    <section class='check'>"
+    "\n      <h2>{title}</h2>"
+    "{badge}{summary_block}{details_block}{remediation_block}"
+    "\n    </section>"
+)
+_SUMMARY_TMPL = "\n      <p class='check-summary'>{}</p>"
+_DETAILS_TMPL = (
+    "\n      <div class='check-section-title'>Details</div>"
+    "\n      <pre class='evidence'>{}</pre>"
+)
+_REMEDIATION_TMPL = (
+    "\n      <div class='check-section-title'>What you can do</div>"
+    "\n      <p class='check-section-body'>{}</p>"
+)
+
+
+def _section_html(result: Mapping[str, Any]) -> str:
+    summary = result.get("summary", "")
+    details = result.get("details", "")
+    remediation = result.get("remediation", "")
+
+    return _SECTION_TMPL.format_map(
+        {
+            "title": _esc(result.get("title", "Unknown check")),
+            "badge": _status_badge(result.get("status", "UNKNOWN")),
+            "summary_block": _SUMMARY_TMPL.format(_esc(summary)) if summary else "",
+            "details_block": _DETAILS_TMPL.format(_esc(details)) if details else "",
+            "remediation_block": _REMEDIATION_TMPL.format(_esc(remediation)) if remediation else "",
+        }
+    )
+
+
+def iter_report_html_chunks(
+    check_results: Iterable[Mapping[str, Any]], generated_at: str | None = None
+) -> Iterator[str]:
+    """
+    Yield the report HTML in pieces (document head, summary, one chunk per check, tail),
+    so a caller can write it out without holding the whole document in memory.
+
+    generated_at: display timestamp ("YYYY-MM-DD HH:MM:SS"); defaults to now.
+    """
+    check_results = list(check_results)
+    overall_status, overall_message = classify_overall_status(check_results)
+    if generated_at is None:
+        generated_at = time.strftime("%Y-%m-%d %H:%M:%S")
+
+    yield _DOC_HEAD
+    yield (
+        f"  <div class='meta'>Generated at {_esc(generated_at)}</div>\n"
+        f"  <div class='summary summary-{_esc(overall_status)}'>\n"
+        f"    <p>{_esc(overall_message)}</p>\n"
+        "  </div>\n"
+        "  <div class='checks'>"
+    )
 
     for result in check_results:
-        status = str(result.get("status", "UNKNOWN")).upper()
-        title = result.get("title", "Unknown check")
-        summary = result.get("summary", "")
-        details = result.get("details", "")
-        remediation = result.get("remediation", "")
+        yield _section_html(result)
 
-        html_lines.append("    <section class='check'>")
-        html_lines.append(f"      <h2>{_esc(title)}</h2>")
-        html_lines.append(
-            f"      <div class='check-status status-badge-{_esc(status)}'>Status: {_esc(status)}</div>"
-        )
+    yield _DOC_TAIL
 
-        if summary:
-            html_lines.append(f"      <p class='check-summary'>{_esc(summary)}</p>")
 
-        if details:
-            html_lines.append("      <div class='check-section-title'>Details</div>")
-            html_lines.append(f"      <pre class='evidence'>{_esc(details)}</pre>")
+def build_report_html(check_results: Iterable[Mapping[str, Any]], generated_at: str | None = None) -> str:
+    """
+    Build a complete HTML document as a string from the given check results.
+    This HTML is self-contained (inline CSS, no external scripts or styles).
+    """
+    return "".join(iter_report_html_chunks(check_results, generated_at))
 
-        if remediation:
-            html_lines.append("      <div class='check-section-title'>What you can do</div>")
-            html_lines.append(f"      <p class='check-section-body'>{_esc(remediation)}</p>")
 
-        html_lines.append("    </section>")
+# Report folders already created (or found) in this process; later reports skip the mkdir.
+_ENSURED_DIRS: set[Path] = set()
 
-    html_lines.extend(["  </div>", "</body>", "</html>"])
-    return "\n".join(html_lines)
 
+def default_report_path(base_dir: Path, timestamp: str | None = None) -> Path:
+    """
+    Return <base_dir>/reports/GuardDog_Report_<timestamp>.html, creating the folder if needed.
 
-def default_report_path(base_dir: Path) -> Path:
+    timestamp: file name stamp ("YYYYMMDD_HHMMSS"); defaults to now.
+    """
     reports_dir = base_dir / "reports"
-    reports_dir.mkdir(parents=True, exist_ok=True)
+    if reports_dir not in _ENSURED_DIRS:
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        _ENSURED_DIRS.add(reports_dir)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if timestamp is None:
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
     filename = f"GuardDog_Report_{timestamp}.html"
     return reports_dir / filename
\ No newline at end of file
@@ -2,5 +2,15 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT / "src"))
+
+
+@pytest.fixture(scope="session")
+def main_exit_code():
+    """Run guarddog.main.main() once per test session; smoke tests share its exit code."""
+    from guarddog.main import main
+
+    return main()
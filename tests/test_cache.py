@@ -0,0 +1,36 @@
+from guarddog.checks import _cache
+from guarddog.checks._cache import ttl_cache
+
+
+def test_ttl_cache_reuses_result_until_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(_cache.time, "monotonic", lambda: now[0])
+    calls = []
+
+    @ttl_cache(10)
+    def query():
+        calls.append(1)
+        return len(calls)
+
+    assert query() == 1
+    now[0] += 5
+    assert query() == 1
+    now[0] += 10
+    assert query() == 2
+    query.cache_clear()
+    assert query() == 3
+
+
+def test_ttl_cache_keeps_one_slot_keyed_by_arguments():
+    calls = []
+
+    @ttl_cache(60)
+    def query(value):
+        calls.append(value)
+        return value * 2
+
+    assert query(1) == 2
+    assert query(1) == 2
+    assert query(2) == 4
+    assert query(1) == 2
+    assert calls == [1, 2, 1]
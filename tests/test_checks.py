@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+from guarddog.checks import _psbatch, clear_caches, firewall, local_admins, rdp, run_all
+from guarddog.checks._psbatch import PowerShellBatch
+
+
+def _check(name, result=None, error=None):
+    def run():
+        if error is not None:
+            raise error
+        return result
+
+    return types.SimpleNamespace(__name__=name, __doc__="Broken check\nmore", run=run)
+
+
+def test_run_all_keeps_order_and_isolates_failures():
+    ok = _check("ok", result={"id": "ok", "status": "OK"})
+    broken = _check("broken", error=RuntimeError("boom"))
+
+    results = run_all([broken, ok])
+
+    assert results[1] == {"id": "ok", "status": "OK"}
+    assert results[0]["id"] == "broken"
+    assert results[0]["title"] == "Broken check"
+    assert results[0]["status"] == "UNKNOWN"
+    assert "boom" in results[0]["details"]
+
+
+def test_run_all_with_no_checks():
+    assert run_all([]) == []
+
+
+def test_run_all_normalizes_status_case():
+    results = run_all([_check("a", result={"id": "a", "status": "warn"}), _check("b", result={"id": "b"})])
+    assert [r["status"] for r in results] == ["WARN", "UNKNOWN"]
+
+
+def test_importing_checks_package_does_not_load_check_modules():
+    code = "import sys, guarddog.checks; assert 'guarddog.checks.firewall' not in sys.modules"
+    src = Path(__file__).resolve().parents[1] / "src"
+    subprocess.run([sys.executable, "-c", code], check=True, env={**os.environ, "PYTHONPATH": str(src)})
+
+
+def test_run_all_resolves_check_names():
+    results = run_all(["rdp"])
+    assert results[0]["id"] == "rdp"
+
+
+def test_run_all_runs_the_powershell_batch_once_per_run(monkeypatch):
+    batches = []
+
+    def fake_run(script, timeout_seconds=None):
+        batches.append(script)
+        return b'{"probe": 1}'
+
+    monkeypatch.setattr(_psbatch, "_run_powershell_json", fake_run)
+    probe = _check("probe")
+    probe.run = lambda: {"id": "probe", "status": "OK", "data": PowerShellBatch.get("probe")}
+
+    try:
+        assert run_all([probe, probe])[0]["data"] == 1
+        assert len(batches) == 1
+        run_all([probe])
+        assert len(batches) == 2
+    finally:
+        PowerShellBatch.reset()
+
+
+def test_clear_caches_drops_every_memo(monkeypatch):
+    cleared = []
+    for fn in (firewall._run_netsh_allprofiles, rdp._get_rdp_state, local_admins._get_local_admins_state):
+        monkeypatch.setattr(fn, "cache_clear", lambda fn=fn: cleared.append(fn.__name__))
+    monkeypatch.setattr(PowerShellBatch, "_results", {"defender": {}})
+    monkeypatch.setattr(local_admins, "_account_rids", {"MYPC\\Administrator": 500})
+
+    clear_caches()
+
+    assert sorted(cleared) == ["_get_local_admins_state", "_get_rdp_state", "_run_netsh_allprofiles"]
+    assert PowerShellBatch._results is None
+    assert local_admins._account_rids == {}
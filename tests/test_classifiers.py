@@ -0,0 +1,124 @@
+import pytest
+
+from guarddog.checks.local_admins import LocalAdminsState, _classify_local_admins_state
+from guarddog.checks.rdp import RdpState, _classify_rdp_state
+from guarddog.checks.screen_lock import ScreenLockState, _classify_screen_lock_state
+
+
+# (classifier, state, expected status, substrings of the summary, substrings of the details)
+CASES = [
+    pytest.param(
+        _classify_local_admins_state,
+        LocalAdminsState(members=[], local_admins=[], extra_local_admins=[]),
+        "UNKNOWN",
+        ("could not read",),
+        ("No members were returned",),
+        id="local_admins-unknown-when-empty",
+    ),
+    pytest.param(
+        _classify_local_admins_state,
+        LocalAdminsState(
+            members=["MYPC\\Administrator", "MYDOMAIN\\Domain Admins"],
+            local_admins=["MYPC\\Administrator"],
+            extra_local_admins=[],
+        ),
+        "OK",
+        ("built-in or domain accounts",),
+        ("MYPC\\Administrator", "MYDOMAIN\\Domain Admins"),
+        id="local_admins-ok-when-only-builtin-or-domain",
+    ),
+    pytest.param(
+        _classify_local_admins_state,
+        LocalAdminsState(
+            members=["MYPC\\Administrator", "MYPC\\Alice", "MYDOMAIN\\Domain Admins"],
+            local_admins=["MYPC\\Administrator", "MYPC\\Alice"],
+            extra_local_admins=["MYPC\\Alice"],
+        ),
+        "WARN",
+        ("local user accounts have administrator rights",),
+        ("MYPC\\Alice",),
+        id="local_admins-warn-when-extra-local-admins",
+    ),
+    pytest.param(
+        _classify_rdp_state,
+        RdpState(rdp_enabled=False, nla_required=None),
+        "OK",
+        ("turned OFF",),
+        ("DISABLED",),
+        id="rdp-disabled-is-ok",
+    ),
+    pytest.param(
+        _classify_rdp_state,
+        RdpState(rdp_enabled=True, nla_required=True),
+        "OK",
+        ("NLA",),
+        ("ENABLED", "REQUIRED"),
+        id="rdp-enabled-with-nla-ok",
+    ),
+    pytest.param(
+        _classify_rdp_state,
+        RdpState(rdp_enabled=True, nla_required=False),
+        "HIGH",
+        ("NOT required",),
+        (),
+        id="rdp-enabled-without-nla-high",
+    ),
+    pytest.param(
+        _classify_rdp_state,
+        RdpState(rdp_enabled=None, nla_required=None),
+        "UNKNOWN",
+        ("could not determine",),
+        (),
+        id="rdp-unknown",
+    ),
+    pytest.param(
+        _classify_screen_lock_state,
+        ScreenLockState(active=False, secure=None, timeout_seconds=None),
+        "HIGH",
+        ("turned OFF",),
+        ("DISABLED",),
+        id="screen_lock-high-when-disabled",
+    ),
+    pytest.param(
+        _classify_screen_lock_state,
+        ScreenLockState(active=True, secure=True, timeout_seconds=10 * 60),
+        "OK",
+        ("Automatic screen lock is enabled",),
+        ("Idle timeout",),
+        id="screen_lock-ok-when-secure-and-short-timeout",
+    ),
+    pytest.param(
+        _classify_screen_lock_state,
+        ScreenLockState(active=True, secure=True, timeout_seconds=45 * 60),
+        "WARN",
+        ("quite long",),
+        (),
+        id="screen_lock-warn-when-long-timeout",
+    ),
+    pytest.param(
+        _classify_screen_lock_state,
+        ScreenLockState(active=True, secure=False, timeout_seconds=10 * 60),
+        "WARN",
+        ("password does NOT appear to be required",),
+        ("Require password on resume",),
+        id="screen_lock-warn-when-not-secure",
+    ),
+    pytest.param(
+        _classify_screen_lock_state,
+        ScreenLockState(active=None, secure=None, timeout_seconds=None),
+        "UNKNOWN",
+        ("could not determine",),
+        (),
+        id="screen_lock-unknown-when-all-unknown",
+    ),
+]
+
+
+@pytest.mark.parametrize("classify_fn,state,expected_status,summary_contains,details_contains", CASES)
+def test_classifier(classify_fn, state, expected_status, summary_contains, details_contains):
+    status, summary, details = classify_fn(state)
+    assert status == expected_status
+    for text in summary_contains:
+        assert text in summary
+    for text in details_contains:
+        assert text in details
@@ -0,0 +1,58 @@
+import types
+
+from guarddog.checks import _com
+from guarddog.checks._com import com_scope
+
+
+def test_com_scope_initializes_once_per_thread(monkeypatch):
+    calls = []
+    fake = types.SimpleNamespace(
+        COINIT_MULTITHREADED=0,
+        CoInitializeEx=lambda flags: calls.append("init"),
+        CoUninitialize=lambda: calls.append("uninit"),
+    )
+    monkeypatch.setattr(_com, "_pythoncom", lambda: fake)
+
+    with com_scope() as outer:
+        with com_scope() as inner:
+            assert inner is True
+        assert outer is True
+        assert calls == ["init"]
+    assert calls == ["init", "uninit"]
+
+
+def test_com_scope_without_pywin32(monkeypatch):
+    monkeypatch.setattr(_com, "_pythoncom", lambda: None)
+    with com_scope() as ready:
+        assert ready is False
+
+
+def _failing_pythoncom(calls, hresult):
+    class com_error(Exception):
+        pass
+
+    def _init(flags):
+        raise com_error(hresult, "CoInitializeEx failed", None, None)
+
+    return types.SimpleNamespace(
+        COINIT_MULTITHREADED=0,
+        com_error=com_error,
+        CoInitializeEx=_init,
+        CoUninitialize=lambda: calls.append("uninit"),
+    )
+
+
+def test_com_scope_uses_existing_sta_without_uninitializing(monkeypatch):
+    calls = []
+    monkeypatch.setattr(_com, "_pythoncom", lambda: _failing_pythoncom(calls, _com.RPC_E_CHANGED_MODE))
+    with com_scope() as ready:
+        assert ready is True
+    assert calls == []
+
+
+def test_com_scope_real_failure_is_not_ready(monkeypatch):
+    calls = []
+    monkeypatch.setattr(_com, "_pythoncom", lambda: _failing_pythoncom(calls, -2147467259))  # E_FAIL
+    with com_scope() as ready:
+        assert ready is False
+    assert calls == []
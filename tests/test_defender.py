@@ -1,4 +1,5 @@
-from guarddog.checks.defender import DefenderState, _classify_defender_state
+from guarddog.checks import defender
+from guarddog.checks.defender import DefenderState, _classify_defender_state, _get_defender_state
 
 
 def test_defender_disabled_is_high():
@@ -29,4 +30,43 @@ def test_defender_unknown_is_unknown():
     status, summary, _ = _classify_defender_state(state)
     assert status == "UNKNOWN"
     # Wording changed to "could not find clear settings ..."
-    assert "could not find clear settings" in summary
\ No newline at end of file
+    assert "could not find clear settings" in summary
+
+
+def test_defender_policy_disabled_skips_other_sources(monkeypatch):
+    reads = []
+
+    def fake_read_dword(root, subkey, value_name):
+        reads.append(subkey)
+        return 1 if subkey == defender.POLICY_KEY_PATH else None
+
+    def no_powershell():
+        raise AssertionError("PowerShell should not be queried")
+
+    monkeypatch.setattr(defender, "winreg_available", lambda: True)
+    monkeypatch.setattr(defender, "hklm", lambda: None)
+    monkeypatch.setattr(defender, "read_dword", fake_read_dword)
+    monkeypatch.setattr(defender, "_query_defender_powershell", no_powershell)
+
+    state = _get_defender_state()
+    assert state.disabled_policy is True
+    assert state.data_source == "registry-policy-fast-path"
+    assert reads == [defender.POLICY_KEY_PATH]
+
+
+def test_defender_wmi_result_skips_powershell(monkeypatch):
+    def no_powershell():
+        raise AssertionError("PowerShell should not be queried")
+
+    monkeypatch.setattr(defender, "winreg_available", lambda: False)
+    monkeypatch.setattr(
+        defender,
+        "_query_defender_wmi",
+        lambda: {"AMServiceEnabled": True, "AntivirusEnabled": True, "RealTimeProtectionEnabled": True},
+    )
+    monkeypatch.setattr(defender, "_query_defender_powershell", no_powershell)
+
+    state = _get_defender_state()
+    assert state.data_source == "wmi"
+    assert state.disabled_local is False
+    assert state.rtp_enabled is True
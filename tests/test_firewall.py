@@ -1,4 +1,9 @@
-from guarddog.checks.firewall import _parse_netsh_allprofiles, _classify_firewall_status
+from guarddog.checks import firewall
+from guarddog.checks.firewall import (
+    _parse_netsh_allprofiles,
+    _parse_ps_firewall_profiles,
+    _classify_firewall_status,
+)
 
 
 def test_parse_netsh_allprofiles_basic():
@@ -20,6 +25,47 @@ def test_parse_netsh_allprofiles_basic():
     }
 
 
+def test_parse_netsh_allprofiles_section_without_state():
+    sample = """
+    Domain Profile Settings:
+        Firewall Policy                       BlockInbound,AllowOutbound
+
+    Private Profile Settings:
+        State                                 OFF
+    """
+    states = _parse_netsh_allprofiles(sample)
+    assert states == {"private": "OFF"}
+
+
+def test_parse_netsh_allprofiles_crlf():
+    sample = "Domain Profile Settings:\r\n----\r\nState                 ON\r\n\r\nPublic Profile Settings:\r\nState OFF\r\n"
+    assert _parse_netsh_allprofiles(sample) == {"domain": "ON", "public": "OFF"}
+
+
+def test_parse_netsh_allprofiles_bytes():
+    sample = b"Domain Profile Settings:\r\nState ON\r\n\r\nPrivate Profile Settings:\r\nState OFF\r\n"
+    assert _parse_netsh_allprofiles(sample) == {"domain": "ON", "private": "OFF"}
+    assert _parse_netsh_allprofiles(b"Ok.\r\n") == {}
+
+
+def test_parse_ps_firewall_profiles_basic():
+    data = [
+        {"Name": "Domain", "Enabled": "True"},
+        {"Name": "Private", "Enabled": "False"},
+        {"Name": "Public", "Enabled": "NotConfigured"},
+    ]
+    states = _parse_ps_firewall_profiles(data)
+    assert states == {
+        "domain": "ON",
+        "private": "OFF",
+        "public": "UNKNOWN(NotConfigured)",
+    }
+
+
+def test_parse_ps_firewall_profiles_no_data():
+    assert _parse_ps_firewall_profiles(None) == {}
+
+
 def test_classify_firewall_status_ok():
     states = {"domain": "ON", "private": "ON", "public": "ON"}
     status, summary, details = _classify_firewall_status(states)
@@ -33,3 +79,49 @@ def test_classify_firewall_status_high_if_any_off():
     status, summary, _ = _classify_firewall_status(states)
     assert status == "HIGH"
     assert "turned OFF" in summary
+
+
+def test_classify_firewall_status_accepts_booleans():
+    states = {"domain": True, "private": True, "public": False}
+    status, _, details = _classify_firewall_status(states)
+    assert status == "HIGH"
+    assert "- Public profile: OFF" in details
+
+
+def test_classify_firewall_status_unknown_profile_warns():
+    status, summary, details = _classify_firewall_status({"domain": "ON", "private": "UNKNOWN", "public": "ON"})
+    assert status == "WARN"
+    assert "could not verify" in summary
+    assert "- Private profile: UNKNOWN" in details
+
+
+def test_classify_firewall_status_unexpected_value_warns():
+    status, summary, _ = _classify_firewall_status({"domain": "ON", "private": "ON", "public": "NOTCONFIGURED"})
+    assert status == "WARN"
+    assert "could not confirm" in summary
+
+
+def test_run_skips_escalation_when_registry_shows_a_profile_off(monkeypatch):
+    def no_escalation():
+        raise AssertionError("slower sources should not be queried")
+
+    monkeypatch.setattr(
+        firewall, "_registry_firewall_states", lambda: {"domain": "UNKNOWN", "private": "OFF", "public": "ON"}
+    )
+    monkeypatch.setattr(firewall, "_query_fw_policy2", no_escalation)
+
+    result = firewall.run()
+    assert result["status"] == "HIGH"
+    assert "- Domain profile: UNKNOWN" in result["details"]
+
+
+def test_run_merges_partial_escalation_with_registry(monkeypatch):
+    monkeypatch.setattr(
+        firewall, "_registry_firewall_states", lambda: {"domain": "ON", "private": "UNKNOWN", "public": "ON"}
+    )
+    monkeypatch.setattr(firewall, "_query_fw_policy2", lambda: {"private": True, "public": None})
+
+    result = firewall.run()
+    assert result["status"] == "OK"
+    assert "- Domain profile: ON" in result["details"]
+    assert "- Public profile: ON" in result["details"]
@@ -0,0 +1,49 @@
+from guarddog.reporting import html_report
+from guarddog.reporting.html_report import build_report_html, classify_overall_status, iter_report_html_chunks
+
+
+def test_build_report_html_structure_and_escaping():
+    html = build_report_html(
+        [{"id": "x", "title": "Fire <wall>", "status": "OK", "summary": "a & b", "details": "", "remediation": ""}]
+    )
+    assert html.startswith("<!DOCTYPE html>\n<html lang='en'>")
+    assert html.endswith("  </div>\n</body>\n</html>")
+    assert "<h2>Fire &lt;wall&gt;</h2>" in html
+    assert "status-badge-OK'>Status: OK</div>" in html
+    assert "<p class='check-summary'>a &amp; b</p>" in html
+    assert "Details" not in html
+
+
+def test_classify_overall_status_priority():
+    assert classify_overall_status([{"status": "OK"}, {"status": "HIGH"}, {"status": "WARN"}])[0] == "HIGH"
+    assert classify_overall_status([{"status": "OK"}, {"status": "WARN"}])[0] == "WARN"
+    assert classify_overall_status([{"status": "OK"}, {}])[0] == "UNKNOWN"
+    assert classify_overall_status([]) == ("UNKNOWN", "GuardDog did not run any checks.")
+
+
+def test_iter_report_html_chunks_one_chunk_per_check():
+    results = [{"title": "A", "status": "OK"}, {"title": "B", "status": "WARN"}]
+    chunks = list(iter_report_html_chunks(results))
+    assert len(chunks) == 2 + len(results) + 1
+    assert "<h2>A</h2>" in chunks[2]
+    assert "<h2>B</h2>" in chunks[3]
+    assert chunks[-1].endswith("</html>")
+
+
+def test_unrecognized_status_renders_unknown_badge():
+    html = build_report_html([{"title": "A", "status": None}, {"title": "B", "status": "WARN"}])
+    assert "status-badge-UNKNOWN'>Status: UNKNOWN</div>" in html
+    assert "status-badge-WARN'>Status: WARN</div>" in html
+
+
+def test_default_report_path_creates_folder_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(html_report, "_ENSURED_DIRS", set())
+
+    first = html_report.default_report_path(tmp_path, "20240102_030405")
+    assert first == tmp_path / "reports" / "GuardDog_Report_20240102_030405.html"
+    assert first.parent.is_dir()
+
+    calls = []
+    monkeypatch.setattr(type(first.parent), "mkdir", lambda self, *a, **k: calls.append(self))
+    html_report.default_report_path(tmp_path, "20240102_030406")
+    assert calls == []
@@ -1,34 +1,101 @@
-from guarddog.checks.local_admins import LocalAdminsState, _classify_local_admins_state
+import types
 
+from guarddog.checks import local_admins
+from guarddog.checks.local_admins import (
+    LocalAdminsState,
+    _classify_local_admins_state,
+    _get_local_admins_state,
+    _names_from_data,
+    _names_from_part_components,
+    _parse_names_from_text,
+    _query_local_admins,
+)
 
-def test_local_admins_unknown_when_empty():
-    state = LocalAdminsState(members=[], local_admins=[], extra_local_admins=[])
-    status, summary, details = _classify_local_admins_state(state)
-    assert status == "UNKNOWN"
-    assert "could not read" in summary
-    assert "No members were returned" in details
 
+def test_local_admins_netapi_result_skips_powershell(monkeypatch):
+    def no_powershell(*args, **kwargs):
+        raise AssertionError("PowerShell should not be queried")
 
-def test_local_admins_ok_when_only_builtin_or_domain():
-    state = LocalAdminsState(
-        members=["MYPC\\Administrator", "MYDOMAIN\\Domain Admins"],
-        local_admins=["MYPC\\Administrator"],
-        extra_local_admins=[],
+    monkeypatch.setattr(local_admins, "_netapi_local_admins", lambda: ["MYPC\\Administrator"])
+    monkeypatch.setattr(local_admins.PowerShellBatch, "get", no_powershell)
+    monkeypatch.setattr(local_admins, "run_powershell", no_powershell)
+
+    assert _query_local_admins() == (["MYPC\\Administrator"], "netapi", None)
+
+
+def test_local_admins_state_matches_names_caselessly(monkeypatch):
+    monkeypatch.setenv("COMPUTERNAME", "MYPC")
+    monkeypatch.setattr(
+        local_admins,
+        "_query_local_admins",
+        lambda: (["mypc\\administrator", "MyPc\\Alice", "MYDOMAIN\\Domain Admins"], "netapi", None),
+    )
+    _get_local_admins_state.cache_clear()
+    try:
+        state = _get_local_admins_state()
+    finally:
+        _get_local_admins_state.cache_clear()
+    assert state.local_admins == ["mypc\\administrator", "MyPc\\Alice"]
+    assert state.extra_local_admins == ["MyPc\\Alice"]
+
+
+def test_names_from_part_components():
+    paths = [
+        '\\\\MYPC\\root\\cimv2:Win32_UserAccount.Domain="MYPC",Name="Alice"',
+        '\\\\MYPC\\root\\cimv2:Win32_Group.Domain="MYDOMAIN",Name="Domain Admins"',
+        "garbage",
+    ]
+    assert _names_from_part_components(paths) == ["MYPC\\Alice", "MYDOMAIN\\Domain Admins"]
+    assert _names_from_part_components([]) is None
+
+
+def test_local_admins_state_uses_sid_for_renamed_builtin(monkeypatch):
+    monkeypatch.setenv("COMPUTERNAME", "MYPC")
+    monkeypatch.setattr(
+        local_admins,
+        "_query_local_admins",
+        lambda: (["MYPC\\Root", "MYPC\\Administrator"], "netapi", None),
     )
-    status, summary, details = _classify_local_admins_state(state)
-    assert status == "OK"
-    assert "built-in or domain accounts" in summary
-    assert "MYPC\\Administrator" in details
-    assert "MYDOMAIN\\Domain Admins" in details
+    rids = {"MYPC\\Root": 500, "MYPC\\Administrator": 1001}
+    monkeypatch.setattr(local_admins, "_account_rid", rids.get)
+    _get_local_admins_state.cache_clear()
+    try:
+        state = _get_local_admins_state()
+    finally:
+        _get_local_admins_state.cache_clear()
+    assert state.extra_local_admins == ["MYPC\\Administrator"]
+
+
+def test_names_from_batch_data():
+    assert _names_from_data("MYPC\\Administrator") == ["MYPC\\Administrator"]
+    assert _names_from_data(["MYPC\\Administrator", " ", "MYPC\\Alice"]) == ["MYPC\\Administrator", "MYPC\\Alice"]
+    assert _names_from_data(None) is None
+
 
+def test_parse_names_from_text():
+    assert _parse_names_from_text("Administrator\r\nAlice\r\n\r\n") == ["Administrator", "Alice"]
+    assert _parse_names_from_text("  \n") is None
 
-def test_local_admins_warn_when_extra_local_admins_present():
+
+def test_local_admins_details_mark_local_accounts():
     state = LocalAdminsState(
-        members=["MYPC\\Administrator", "MYPC\\Alice", "MYDOMAIN\\Domain Admins"],
+        members=["MYPC\\Administrator", "mypc\\alice", "MYDOMAIN\\Domain Admins"],
         local_admins=["MYPC\\Administrator", "MYPC\\Alice"],
         extra_local_admins=["MYPC\\Alice"],
     )
-    status, summary, details = _classify_local_admins_state(state)
-    assert status == "WARN"
-    assert "local user accounts have administrator rights" in summary
-    assert "MYPC\\Alice" in details
+    _, _, details = _classify_local_admins_state(state)
+    assert "- MYPC\\Administrator (built-in local account)" in details
+    assert "- mypc\\alice (local user account)" in details
+    assert "- MYDOMAIN\\Domain Admins\n" in details
+
+
+def test_account_rid_failure_is_not_cached(monkeypatch):
+    lookups = []
+    fake_advapi32 = types.SimpleNamespace(LookupAccountNameW=lambda *args: lookups.append(args[1]) or 0)
+    monkeypatch.setattr(local_admins, "_advapi32", lambda: fake_advapi32)
+    monkeypatch.setattr(local_admins, "_account_rids", {})
+
+    assert local_admins._account_rid("MYPC\\Ghost") is None
+    assert local_admins._account_rid("MYPC\\Ghost") is None
+    assert lookups == ["MYPC\\Ghost", "MYPC\\Ghost"]
+    assert local_admins._account_rids == {}
@@ -0,0 +1,13 @@
+import pytest
+
+from guarddog.main import _parse_args
+
+
+def test_ps_timeout_accepts_positive_seconds():
+    assert _parse_args(["--ps-timeout", "0.5"]).ps_timeout == 0.5
+
+
+@pytest.mark.parametrize("value", ["0", "-3", "nan", "inf", "abc"])
+def test_ps_timeout_rejects_non_positive_values(value):
+    with pytest.raises(SystemExit):
+        _parse_args(["--ps-timeout", value])
@@ -0,0 +1,16 @@
+import base64
+import re
+
+from guarddog.checks._ps_host import _encode_command
+
+
+def test_encode_command_is_one_line_with_end_marker():
+    script = "$a = 1\nforeach ($i in 1..2) {\n  $i\n}"
+    line = _encode_command(script, "7").decode("utf-8")
+
+    assert line.endswith("\n")
+    assert line.count("\n") == 1
+    assert "'<<END:7:' + $__gd_ok + '>>'" in line
+
+    encoded = re.search(r"FromBase64String\('([^']+)'\)", line).group(1)
+    assert base64.b64decode(encoded).decode("utf-8") == script
@@ -0,0 +1,69 @@
+import threading
+import time
+
+from guarddog.checks import _psbatch
+from guarddog.checks._psbatch import PowerShellBatch, _build_batch_script
+
+
+def test_build_batch_script_keys_results_by_check_id():
+    script = _build_batch_script({"defender": "Get-MpComputerStatus", "firewall": "Get-NetFirewallProfile"})
+    assert script.startswith("$results = @{}")
+    assert "$results['defender'] = (Get-MpComputerStatus)" in script
+    assert "$results['firewall'] = (Get-NetFirewallProfile)" in script
+    assert script.endswith("ConvertTo-Json -Compress -Depth 4")
+
+
+def test_batch_runs_powershell_once_and_caches(monkeypatch):
+    calls = []
+
+    def fake_run(script, timeout_seconds=None):
+        calls.append(script)
+        return b'\xef\xbb\xbf{"defender": {"RealTimeProtectionEnabled": true}}'
+
+    monkeypatch.setattr(_psbatch, "_run_powershell_json", fake_run)
+    PowerShellBatch.reset()
+    try:
+        assert PowerShellBatch.get("defender") == {"RealTimeProtectionEnabled": True}
+        assert PowerShellBatch.get("missing") is None
+        assert len(calls) == 1
+    finally:
+        PowerShellBatch.reset()
+
+
+def test_batch_timeout_is_cached_for_the_run(monkeypatch):
+    timeouts = []
+
+    def fake_run(script, timeout_seconds=None):
+        timeouts.append(timeout_seconds)
+        time.sleep(0.05)  # timed out: no output
+        return None
+
+    monkeypatch.setattr(_psbatch, "_run_powershell_json", fake_run)
+    PowerShellBatch.reset()
+    try:
+        results = []
+        callers = [threading.Thread(target=lambda: results.append(PowerShellBatch.get("defender"))) for _ in range(2)]
+        for caller in callers:
+            caller.start()
+        for caller in callers:
+            caller.join()
+        assert results == [None, None]
+        assert len(timeouts) == 1
+        # The budget grows with the number of registered fragments.
+        assert timeouts[0] == _psbatch._batch_timeout(len(PowerShellBatch._snippets))
+        assert timeouts[0] > _psbatch._timeout_seconds * len(PowerShellBatch._snippets)
+
+        # The next run tries again.
+        PowerShellBatch.reset()
+        assert PowerShellBatch.get("defender") is None
+        assert len(timeouts) == 2
+    finally:
+        PowerShellBatch.reset()
+
+
+def test_run_powershell_returns_text(monkeypatch):
+    outputs = [b"\xef\xbb\xbfAdministrator\nAlice", None]
+    monkeypatch.setattr(_psbatch, "_run_powershell_json", lambda script, timeout_seconds=None: outputs.pop(0))
+
+    assert _psbatch.run_powershell("Write-Output x") == "Administrator\nAlice"
+    assert _psbatch.run_powershell("Write-Output x") is None
@@ -1,32 +1,27 @@
-from guarddog.checks.rdp import RdpState, _classify_rdp_state
-
-
-def test_rdp_disabled_is_ok():
-    state = RdpState(rdp_enabled=False, nla_required=None)
-    status, summary, details = _classify_rdp_state(state)
-    assert status == "OK"
-    assert "turned OFF" in summary
-    assert "DISABLED" in details
-
-
-def test_rdp_enabled_with_nla_ok():
-    state = RdpState(rdp_enabled=True, nla_required=True)
-    status, summary, details = _classify_rdp_state(state)
-    assert status == "OK"
-    assert "NLA" in summary
-    assert "ENABLED" in details
-    assert "REQUIRED" in details
-
-
-def test_rdp_enabled_without_nla_high():
-    state = RdpState(rdp_enabled=True, nla_required=False)
-    status, summary, _ = _classify_rdp_state(state)
-    assert status == "HIGH"
-    assert "NOT required" in summary or "NOT required" in _  # wording check
-
-
-def test_rdp_unknown_is_unknown():
-    state = RdpState(rdp_enabled=None, nla_required=None)
-    status, summary, _ = _classify_rdp_state(state)
-    assert status == "UNKNOWN"
-    assert "could not determine" in summary
+from guarddog.checks import rdp
+from guarddog.checks.rdp import _get_rdp_state
+
+
+def test_rdp_values_read_once_per_subkey(monkeypatch):
+    calls = []
+
+    def fake_read_dwords(root, subkey, names):
+        calls.append((subkey, tuple(names)))
+        return {"fDenyTSConnections": 0, "UserAuthentication": 1, "SecurityLayer": 2}
+
+    monkeypatch.setattr(rdp, "winreg_available", lambda: True)
+    monkeypatch.setattr(rdp, "hklm", lambda: None)
+    monkeypatch.setattr(rdp, "read_dwords", fake_read_dwords)
+
+    _get_rdp_state.cache_clear()
+    try:
+        state = _get_rdp_state()
+    finally:
+        _get_rdp_state.cache_clear()
+    assert state.rdp_enabled is True
+    assert state.nla_required is True
+    assert state.security_layer == 2
+    assert calls == [
+        (rdp.RDP_KEY_PATH, ("fDenyTSConnections",)),
+        (rdp.RDP_TCP_KEY_PATH, ("UserAuthentication", "SecurityLayer")),
+    ]
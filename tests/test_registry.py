@@ -0,0 +1,127 @@
+import types
+
+from guarddog.checks import _registry
+
+
+def test_read_values_reuses_result_while_key_unchanged(monkeypatch):
+    last_write = [100]
+    queries = []
+
+    fake_winreg = types.SimpleNamespace(QueryInfoKey=lambda key: (0, 2, last_write[0]))
+    monkeypatch.setattr(_registry, "load_winreg", lambda: fake_winreg)
+    monkeypatch.setattr(_registry, "_open_key_cached", lambda root, subkey: object())
+
+    def _query_fake(key, names):
+        queries.append(names)
+        return {name: len(queries) for name in names}
+
+    _registry.clear_values_cache()
+    try:
+        assert _registry._read_values(1, r"Some\Key", ("A", "B"), _query_fake) == {"A": 1, "B": 1}
+        assert _registry._read_values(1, r"some\key", ("A", "B"), _query_fake) == {"A": 1, "B": 1}
+        assert len(queries) == 1
+
+        last_write[0] = 101
+        assert _registry._read_values(1, r"Some\Key", ("A", "B"), _query_fake) == {"A": 2, "B": 2}
+        assert len(queries) == 2
+    finally:
+        _registry.clear_values_cache()
+
+
+def test_read_values_missing_key(monkeypatch):
+    monkeypatch.setattr(_registry, "_open_key_cached", lambda root, subkey: None)
+    assert _registry.read_dwords(1, r"Missing\Key", ("A",)) == {"A": None}
+
+
+def test_query_dwords_accepts_qword_and_skips_other_types(monkeypatch):
+    values = {"Dword": (1, 4), "Qword": (2, 11), "Text": ("1", 1)}
+
+    def _query_value_ex(key, name):
+        if name not in values:
+            raise OSError(name)
+        return values[name]
+
+    fake_winreg = types.SimpleNamespace(QueryValueEx=_query_value_ex)
+    monkeypatch.setattr(_registry, "load_winreg", lambda: fake_winreg)
+    monkeypatch.setattr(_registry, "_reg_get_value_w", lambda: None)
+
+    names = ("Dword", "Qword", "Text", "Missing")
+    assert _registry._query_dwords(object(), names) == {"Dword": 1, "Qword": 2, "Text": None, "Missing": None}
+
+
+def test_failed_key_open_is_retried_and_clear_closes_handles(monkeypatch):
+    class FakeKey:
+        closed = False
+
+        def Close(self):
+            self.closed = True
+
+    opened = []
+    exists = [False]
+
+    def _open_key(root, subkey, reserved, access):
+        if not exists[0]:
+            raise OSError("missing")
+        opened.append(FakeKey())
+        return opened[-1]
+
+    fake_winreg = types.SimpleNamespace(OpenKey=_open_key)
+    monkeypatch.setattr(_registry, "load_winreg", lambda: fake_winreg)
+    monkeypatch.setattr(_registry, "_read_access", lambda: 0)
+
+    _registry.clear_values_cache()
+    try:
+        assert _registry._open_key_cached(1, r"Policy\Key") is None
+        exists[0] = True
+        key = _registry._open_key_cached(1, r"Policy\Key")
+        assert key is opened[0]
+        assert _registry._open_key_cached(1, r"policy\key") is key
+
+        _registry.clear_values_cache()
+        assert key.closed
+        assert _registry._open_key_cached(1, r"Policy\Key") is opened[1]
+    finally:
+        _registry.clear_values_cache()
+
+
+def test_read_values_reopens_a_deleted_key(monkeypatch):
+    class FakeKey:
+        def __init__(self, value):
+            self.value = value
+            self.deleted = False
+            self.closed = False
+
+        def Close(self):
+            self.closed = True
+
+    opened = []
+
+    def _open_key(root, subkey, reserved, access):
+        opened.append(FakeKey(len(opened) + 1))
+        return opened[-1]
+
+    def _query_info_key(key):
+        if key.deleted:
+            raise OSError("ERROR_KEY_DELETED")
+        return (0, 1, 100 + key.value)
+
+    def _query_value_ex(key, name):
+        if key.deleted:
+            raise OSError("ERROR_KEY_DELETED")
+        return (key.value, 4)
+
+    fake_winreg = types.SimpleNamespace(OpenKey=_open_key, QueryInfoKey=_query_info_key, QueryValueEx=_query_value_ex)
+    monkeypatch.setattr(_registry, "load_winreg", lambda: fake_winreg)
+    monkeypatch.setattr(_registry, "_read_access", lambda: 0)
+    monkeypatch.setattr(_registry, "_reg_get_value_w", lambda: None)
+
+    _registry.clear_values_cache()
+    try:
+        assert _registry._read_values(1, r"Policy\Key", ("A",), _registry._query_dwords) == {"A": 1}
+
+        opened[0].deleted = True  # key deleted and recreated behind the cached handle
+        assert _registry._read_values(1, r"Policy\Key", ("A",), _registry._query_dwords) == {"A": 2}
+        assert opened[0].closed
+        assert len(opened) == 2
+    finally:
+        _registry.clear_values_cache()
@@ -1,39 +1,32 @@
-from guarddog.checks.screen_lock import ScreenLockState, _classify_screen_lock_state
-
-
-def test_screen_lock_high_when_disabled():
-    state = ScreenLockState(active=False, secure=None, timeout_seconds=None)
-    status, summary, details = _classify_screen_lock_state(state)
-    assert status == "HIGH"
-    assert "turned OFF" in summary
-    assert "DISABLED" in details
-
-
-def test_screen_lock_ok_when_secure_and_short_timeout():
-    state = ScreenLockState(active=True, secure=True, timeout_seconds=10 * 60)
-    status, summary, details = _classify_screen_lock_state(state)
-    assert status == "OK"
-    assert "automatic screen lock is enabled" in summary.lower()
-    assert "Idle timeout" in details or "timeout" in details
-
-
-def test_screen_lock_warn_when_long_timeout():
-    state = ScreenLockState(active=True, secure=True, timeout_seconds=45 * 60)
-    status, summary, _ = _classify_screen_lock_state(state)
-    assert status == "WARN"
-    assert "quite long" in summary
-
-
-def test_screen_lock_warn_when_not_secure():
-    state = ScreenLockState(active=True, secure=False, timeout_seconds=10 * 60)
-    status, summary, details = _classify_screen_lock_state(state)
-    assert status == "WARN"
-    assert "password does NOT appear to be required" in summary
-    assert "Require password on resume" in details
-
-
-def test_screen_lock_unknown_when_all_unknown():
-    state = ScreenLockState(active=None, secure=None, timeout_seconds=None)
-    status, summary, _ = _classify_screen_lock_state(state)
-    assert status == "UNKNOWN"
-    assert "could not determine" in summary
+from guarddog.checks import screen_lock
+from guarddog.checks.screen_lock import (
+    ScreenLockState,
+    _get_screen_lock_state,
+    _to_bool,
+    _to_timeout,
+)
+
+
+def test_screen_lock_values_read_in_one_call(monkeypatch):
+    calls = []
+
+    def fake_read_strings(root, subkey, names):
+        calls.append((subkey, tuple(names)))
+        return {"ScreenSaveActive": "1", "ScreenSaverIsSecure": "1", "ScreenSaveTimeOut": "600"}
+
+    monkeypatch.setattr(screen_lock, "read_strings", fake_read_strings)
+
+    state = _get_screen_lock_state()
+    assert state == ScreenLockState(active=True, secure=True, timeout_seconds=600)
+    assert calls == [(screen_lock.DESKTOP_KEY_PATH, screen_lock.DESKTOP_VALUE_NAMES)]
+
+
+def test_screen_lock_value_converters():
+    assert _to_bool("1") is True
+    assert _to_bool("0") is False
+    assert _to_bool(None) is None
+    assert _to_timeout("600") == 600
+    assert _to_timeout("0") is None
+    assert _to_timeout("-5") is None
+    assert _to_timeout("abc") is None
+    assert _to_timeout(None) is None
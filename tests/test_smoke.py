@@ -1,10 +1,10 @@
 """
 Very basic smoke test to ensure the GuardDog package imports and main() runs.
+
+main() itself runs once per session (see the main_exit_code fixture in conftest.py).
 """
 
-from guarddog.main import main
 
-def test_main_runs():
+def test_main_runs(main_exit_code):
     # For now we just assert that main() returns an int and does not crash.
-    code = main()
-    assert isinstance(code, int)
+    assert isinstance(main_exit_code, int)